@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+자동화 데몬 제어 클라이언트 (가벼운 버전)
+psutil 등을 불러오지 않고 제어 소켓에 요청만 보내므로 밀리초 단위로 응답한다
+
+사용법:
+    python3 automation_ctl.py [--socket PATH] status
+    python3 automation_ctl.py pause | resume | skip
+    python3 automation_ctl.py enqueue "@direction_1.md"
+    python3 automation_ctl.py enqueue '{"command": "@direction_1.md", "max_count": 2}'
+
+소켓 경로는 --socket, 없으면 현재 디렉토리 config.json의 control_socket, 그것도 없으면 기본 경로를 사용한다
+skip과 enqueue는 진행 상태 저널에 기록되므로 데몬을 재시작해도 유지된다 (journal_enabled가 false면 유지되지 않음)
+"""
+
+import json
+import sys
+
+from control_socket import configured_socket_path, send_request
+
+
+def main():
+    args = sys.argv[1:]
+    socket_path = None
+    if args[:1] == ['--socket'] and len(args) >= 2:
+        socket_path = args[1]
+        args = args[2:]
+    if not args:
+        print(__doc__.strip())
+        return 2
+
+    socket_path = socket_path or configured_socket_path()
+    if socket_path is None:
+        print("❌ config.json에서 제어 소켓이 꺼져 있습니다 (control_socket: null)", file=sys.stderr)
+        return 1
+    line = ' '.join(args)
+    try:
+        response = send_request(line, socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ 자동화 데몬에 연결할 수 없습니다: {socket_path}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"❌ 제어 요청 실패: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    return 0 if response.get('ok') else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
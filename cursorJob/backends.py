@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+UI 백엔드
+명령을 실제 Cursor 창(UI 드라이버)이나 가상 IDE로 보내는 부분을 분리한다
+
+백엔드 인터페이스:
+    activate_chat()                          최초 채팅창 활성화
+    send(workspace, command, command_config) 명령 입력 및 전송 (실패 시 False 또는 예외)
+    completion_probe(workspace, command_config) 작업 완료 감지기 (없으면 None)
+    health_check()                           입력 없이 가볍게 상태 확인 (정상 여부, 설명) - 회로 차단기 복구 확인용
+    close()
+"""
+
+import random
+import threading
+import time
+
+from completion import CompletionProbe, create_completion_probe
+
+
+class DriverBackend:
+    """UI 드라이버로 실제 Cursor 창을 조작 (창 제목으로 워크스페이스를 구분)"""
+
+    def __init__(self, automation):
+        self.automation = automation
+
+    def activate_chat(self):
+        self.automation.drive_ui_activation()
+
+    def send(self, workspace, command, command_config):
+        """워크스페이스 창을 앞으로 가져온 뒤 명령 전송 (성공 여부 반환)"""
+        if workspace.window_title:
+            try:
+                self.automation.get_ui_driver().request(
+                    'focus_window', app=self.automation.target_app, title=workspace.window_title)
+            except Exception as e:
+                self.automation.log_message(f"[{workspace.name}] 창 전환 실패: {e}")
+                return False
+        self.automation.drive_ui_send(command, command_config, workspace.root)
+        return True
+
+    def completion_probe(self, workspace, command_config):
+        return create_completion_probe(command_config, workspace.root)
+
+    def health_check(self):
+        """드라이버가 응답하고 대상 앱의 UI 요소에 접근할 수 있는지 확인 (키 입력 없음)"""
+        app = self.automation.target_app
+        try:
+            state = self.automation.get_ui_driver().request('probe', app=app) or {}
+        except Exception as e:
+            return False, str(e)
+        if state.get('focused_role') is None:
+            return False, f"{app} UI 요소에 접근할 수 없음 (최전면: {state.get('frontmost')})"
+        return True, f"최전면: {state.get('frontmost')}"
+
+    def close(self):
+        self.automation.close_ui_driver()
+
+
+class SimulatedCompletionProbe(CompletionProbe):
+    """가상 IDE의 AI 작업이 끝났는지 확인"""
+
+    def __init__(self, backend, workspace):
+        self.backend = backend
+        self.workspace = workspace
+        self.description = f"가상 AI 작업 ({workspace.name})"
+
+    def is_complete(self):
+        return self.backend.is_complete(self.workspace)
+
+
+class SimulatedBackend:
+    """테스트/벤치마크용 가상 UI 백엔드: 입력 지연, 전송 실패, AI 작업 시간을 흉내내고 포커스 충돌을 기록"""
+
+    def __init__(self, input_latency=0.05, completion_time=1.0, jitter=0.0, failure_rate=0.0,
+                 activation_latency=0.0, seed=None, clock=time.monotonic):
+        self.input_latency = input_latency
+        self.completion_time = completion_time
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.activation_latency = activation_latency
+        self.random = random.Random(seed)
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.busy_until = {}
+        self.in_use = 0
+        self.focus_conflicts = 0
+        self.failures = 0
+        self.busy_seconds = 0.0  # 입력 구간에서 보낸 시간 (스케줄러 오버헤드 계산용)
+        self.sends = []
+
+    def activate_chat(self):
+        time.sleep(self.activation_latency)
+
+    def send(self, workspace, command, command_config):
+        with self.lock:
+            self.in_use += 1
+            if self.in_use > 1:
+                # UI 입력 구간이 동시에 실행되면 실제 환경에서는 포커스를 빼앗긴다
+                self.focus_conflicts += 1
+        started = self.clock()
+        try:
+            time.sleep(self.input_latency)
+            with self.lock:
+                self.busy_seconds += self.clock() - started
+                if self.random.random() < self.failure_rate:
+                    self.failures += 1
+                    raise RuntimeError(f"가상 전송 실패: {command}")
+                work = self.completion_time + self.random.uniform(-self.jitter, self.jitter)
+                self.busy_until[workspace.name] = self.clock() + max(work, 0)
+                self.sends.append((self.clock(), workspace.name, command))
+            return True
+        finally:
+            with self.lock:
+                self.in_use -= 1
+
+    def is_complete(self, workspace):
+        with self.lock:
+            return self.clock() >= self.busy_until.get(workspace.name, 0)
+
+    def completion_probe(self, workspace, command_config):
+        return SimulatedCompletionProbe(self, workspace)
+
+    def health_check(self):
+        return True, "가상 IDE"
+
+    def close(self):
+        pass
+
+
+def create_backend(config, automation):
+    """설정값(ui_backend)에 맞는 UI 백엔드를 생성"""
+    if config.get('ui_backend', 'driver') == 'simulated':
+        sim = config.get('simulated_backend', {})
+        return SimulatedBackend(
+            input_latency=sim.get('input_latency', 0.05),
+            completion_time=sim.get('completion_time', 1.0),
+            jitter=sim.get('jitter', 0.0),
+            failure_rate=sim.get('failure_rate', 0.0),
+            activation_latency=sim.get('activation_latency', 0.0),
+            seed=sim.get('seed'),
+        )
+    return DriverBackend(automation)
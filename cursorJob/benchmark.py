@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+자동화 루프 벤치마크
+가상 IDE 백엔드(SimulatedBackend)로 run_automation을 실행해서 Cursor 없이도(Linux 포함)
+처리량과 스케줄러 오버헤드를 측정한다
+
+사용법:
+    python3 benchmark.py
+    python3 benchmark.py --sizes 10 100 1000 10000 --input-latency 0.002 --completion-time 0.005
+    python3 benchmark.py --failure-rate 0.05 --json
+
+측정 항목:
+    sends/min    성공한 전송 수 / 전체 소요 시간
+    idle         interval, 명령 간 대기(idle)로 보낸 시간
+    overhead     전체 시간에서 입력 구간, 완료 대기, idle을 뺀 나머지 (큐 관리, 로그, 지표 등)
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from optimized_automation import OptimizedCursorAutomation
+
+
+def synthetic_commands(size, interval=0, max_count=1):
+    """서로 다른 명령 size개로 전개되는 템플릿 항목 (큐에서 필요할 때 하나씩 전개됨)"""
+    return [{'template': "benchmark prompt {n}", 'params': {'n': {'range': [1, size]}},
+             'interval': interval, 'max_count': max_count}]
+
+
+def benchmark_config(commands, args, lock_file):
+    return {
+        'commands': commands,
+        'ui_backend': 'simulated',
+        'simulated_backend': {
+            'input_latency': args.input_latency,
+            'completion_time': args.completion_time,
+            'jitter': args.jitter,
+            'failure_rate': args.failure_rate,
+            'seed': args.seed,
+        },
+        'readiness_probe': 'none',
+        'retry': {'max_attempts': args.max_attempts, 'backoff': args.retry_backoff},
+        'circuit_breaker': {'failure_threshold': args.breaker_threshold, 'cooldown': args.breaker_cooldown},
+        'command_interval_delay': args.command_interval_delay,
+        'startup_delay': 0,
+        'lock_file': lock_file,
+        'control_socket': None,
+        'journal_enabled': False,
+        'send_cache_enabled': False,
+        'delay_profile_file': None,
+        'metrics_file': None,
+        'trace_file': None,
+        'config_watch': False,
+    }
+
+
+def phase_seconds(metrics, phase):
+    """모든 명령을 합친 단계별 누적 소요 시간"""
+    with metrics.lock:
+        return sum(h.sum for (name, _), h in metrics.histograms.items() if name == phase)
+
+
+def run_once(size, args, lock_file):
+    commands = synthetic_commands(size, args.interval, args.max_count)
+    automation = OptimizedCursorAutomation(config=benchmark_config(commands, args, lock_file))
+    if not args.verbose:
+        automation.log_message = lambda message: None
+
+    started = time.monotonic()
+    automation.run_automation()
+    wall = time.monotonic() - started
+
+    backend = automation.backend
+    sent = len(backend.sends)
+    wait = phase_seconds(automation.metrics, 'wait_completion')
+    overhead = max(wall - backend.busy_seconds - wait - automation.idle_seconds, 0.0)
+    attempts = sent + backend.failures
+    return {
+        'size': size,
+        'sent': sent,
+        'failures': backend.failures,
+        'wall_seconds': round(wall, 3),
+        'sends_per_minute': round(sent / wall * 60, 1) if wall else None,
+        'input_seconds': round(backend.busy_seconds, 3),
+        'wait_seconds': round(wait, 3),
+        'idle_seconds': round(automation.idle_seconds, 3),
+        'overhead_seconds': round(overhead, 3),
+        'overhead_ms_per_send': round(overhead / attempts * 1000, 3) if attempts else None,
+    }
+
+
+def print_table(results):
+    header = f"{'size':>7} {'sent':>7} {'fail':>5} {'wall(s)':>9} {'sends/min':>11} " \
+             f"{'input(s)':>9} {'wait(s)':>9} {'idle(s)':>9} {'overhead(s)':>12} {'ms/send':>8}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(f"{r['size']:>7} {r['sent']:>7} {r['failures']:>5} {r['wall_seconds']:>9.3f} "
+              f"{r['sends_per_minute']:>11.1f} {r['input_seconds']:>9.3f} {r['wait_seconds']:>9.3f} "
+              f"{r['idle_seconds']:>9.3f} {r['overhead_seconds']:>12.3f} {r['overhead_ms_per_send']:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='가상 IDE 백엔드로 자동화 루프 처리량 측정')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help='가상 명령 큐 크기 (기본: 10 100 1000 10000)')
+    parser.add_argument('--max-count', type=int, default=1, help='명령별 전송 횟수')
+    parser.add_argument('--interval', type=float, default=0, help='명령별 interval (초)')
+    parser.add_argument('--command-interval-delay', type=float, default=0, help='명령 간 대기 (초)')
+    parser.add_argument('--input-latency', type=float, default=0.001, help='가상 입력 지연 (초)')
+    parser.add_argument('--completion-time', type=float, default=0.0, help='가상 AI 작업 시간 (초)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='AI 작업 시간 변동폭 (초)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='전송 실패 확률 (0~1)')
+    parser.add_argument('--max-attempts', type=int, default=3, help='전송 실패 시 최대 시도 횟수')
+    parser.add_argument('--retry-backoff', type=float, default=0.01, help='재시도 백오프 시작값 (초)')
+    parser.add_argument('--breaker-threshold', type=int, default=5, help='회로 차단기를 여는 연속 실패 횟수 (0: 사용 안 함)')
+    parser.add_argument('--breaker-cooldown', type=float, default=0.1, help='회로 차단기 상태 확인 대기 (초)')
+    parser.add_argument('--seed', type=int, default=1, help='난수 시드')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    parser.add_argument('-v', '--verbose', action='store_true', help='자동화 로그 출력')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='automation-bench-') as tmp:
+        lock_file = os.path.join(tmp, 'bench.lock')
+        for size in args.sizes:
+            results.append(run_once(size, args, lock_file))
+            if not args.json:
+                print(f"  {size}개 완료 ({results[-1]['wall_seconds']}초)", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
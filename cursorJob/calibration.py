@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+딜레이 자동 보정
+config.json의 딜레이(activation_delay 등)는 느린 환경 기준의 추정값이라 빠른 환경에서는 지나치게 길다
+보정 방식은 준비 상태를 확인할 수 있는지에 따라 다르다
+- 확인 가능(readiness_probe: driver): 딜레이는 준비되면 바로 끝나는 대기의 상한이므로 줄여도 빨라지지 않는다
+  단계별로 실제 준비까지 걸린 시간을 모아 p95 x margin을 상한으로 학습한다 (시간 초과는 상한을 늘린 값으로 기록)
+- 확인 불가(readiness_probe: none): 딜레이가 그대로 고정 대기이므로 전송 결과를 보고 AIMD 방식으로 조정한다
+  성공: step만큼 조금씩 줄임 (additive decrease), 실패/입력 누락: backoff배로 크게 늘림 (multiplicative increase)
+학습한 값은 호스트별로 프로필 파일에 저장되고, 이후 실행에서는 보정 모드가 아니어도 자동으로 적용된다
+프로필은 전송마다 쓰지 않고 save_interval초마다, 그리고 종료 시(flush) 저장한다
+"""
+
+import json
+import os
+import platform
+import time
+from collections import deque
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+DEFAULT_PROFILE = os.path.expanduser('~/.cursor_automation_profile.json')
+
+
+class DelayCalibrator:
+    def __init__(self, path, step=0.05, backoff=1.5, min_delay=0.05, max_scale=2.0, host=None,
+                 margin=2.0, min_samples=10, window=100, save_interval=30.0, clock=time.monotonic):
+        self.path = path
+        self.step = step
+        self.backoff = backoff
+        self.min_delay = min_delay
+        self.max_scale = max_scale  # 설정값의 몇 배까지 늘릴 수 있는지
+        self.host = host or platform.node() or 'default'
+        self.margin = margin  # 측정한 준비 시간 p95에 곱하는 여유 배수
+        self.min_samples = min_samples  # 상한을 줄이기 전에 모을 최소 측정 수
+        self.window = window
+        self.save_interval = save_interval
+        self.clock = clock
+        self.learned = {}
+        self.latencies = {}  # 딜레이 키 -> 최근 준비 시간 (이번 실행에서만 유지)
+        self.samples = 0
+        self.dirty = False
+        self.saved_at = clock()
+        self.load()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return profile if isinstance(profile, dict) else {}
+
+    def load(self):
+        """프로필 파일에서 이 호스트의 학습값을 읽음 (없으면 빈 값)"""
+        entry = self._read().get('hosts', {}).get(self.host, {})
+        self.learned = {key: float(value) for key, value in entry.get('delays', {}).items()}
+        self.samples = entry.get('samples', 0)
+
+    def effective(self, configured):
+        """설정 딜레이에 학습값을 덮어쓴 실제 사용 딜레이"""
+        return {key: self.learned.get(key, value) for key, value in configured.items()}
+
+    def observe(self, configured, outcome):
+        """고정 대기 딜레이에 전송 결과 반영 (outcome: {딜레이 키: 성공 여부}) 후 변경된 {키: (이전, 이후)}를 반환"""
+        changes = {}
+        for key, ok in outcome.items():
+            if key not in configured:
+                continue
+            current = self.learned.get(key, configured[key])
+            if ok:
+                updated = max(self.min_delay, current - self.step)
+            else:
+                updated = min(max(current * self.backoff, current + self.step), configured[key] * self.max_scale)
+            self._update(key, current, updated, changes)
+        return self._observed(changes)
+
+    def observe_latency(self, configured, measured):
+        """준비 대기 상한에 측정값 반영 (measured: {딜레이 키: [준비까지 걸린 초, 시간 초과면 None]})
+
+        변경된 {키: (이전, 이후)}를 반환
+        """
+        changes = {}
+        for key, values in measured.items():
+            if key not in configured or not values:
+                continue
+            current = self.learned.get(key, configured[key])
+            window = self.latencies.setdefault(key, deque(maxlen=self.window))
+            timed_out = False
+            for value in values:
+                # 시간 초과: 실제 준비 시간은 상한 이상이므로 상한을 늘린 값으로 기록
+                timed_out = timed_out or value is None
+                window.append(current * self.backoff if value is None else value)
+            if len(window) < self.min_samples and not timed_out:
+                continue
+            target = max(percentile(window, 0.95) * self.margin, self.min_delay)
+            updated = min(target, configured[key] * self.max_scale)
+            self._update(key, current, updated, changes)
+        return self._observed(changes)
+
+    def _update(self, key, current, updated, changes):
+        updated = round(updated, 3)
+        if updated != current:
+            changes[key] = (current, updated)
+            self.dirty = True
+        self.learned[key] = updated
+
+    def _observed(self, changes):
+        self.samples += 1
+        if self.dirty and self.clock() - self.saved_at >= self.save_interval:
+            self.flush()
+        return changes
+
+    def flush(self):
+        """저장하지 않은 학습값이 있으면 프로필에 저장"""
+        if self.dirty:
+            self.save()
+
+    def save(self):
+        """다른 호스트의 값은 유지하고 이 호스트의 값만 갱신 (원자적으로 교체)"""
+        profile = self._read()
+        profile.setdefault('hosts', {})[self.host] = {
+            'delays': self.learned,
+            'samples': self.samples,
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        self.saved_at = self.clock()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+실행 중인 명령 큐
+config.json의 commands 목록을 진행 상태(전송 횟수)와 함께 보관하고,
+설정이 바뀌면 새 목록과 비교해서 완료된 항목은 유지하고 추가/변경된 항목만 반영한다
+템플릿 항목(command_templates)은 필요한 만큼만 전개하고 끝난 항목은 키만 남기고 버린다
+템플릿 항목의 키는 전개된 명령 문자열과 그 등장 순번이므로, 스펙을 고쳐 앞쪽에 항목이 추가/삭제되어도
+끝난 항목은 다시 보내지 않고 새로 생긴 항목만 보낸다
+"""
+
+import itertools
+import threading
+from collections import Counter, deque
+
+from command_templates import expand_template, is_template, template_size, validate_template
+
+
+def command_keys(commands):
+    """명령마다 고유 키 생성 (같은 명령이 여러 번 나오면 등장 순번으로 구분)"""
+    seen = {}
+    keys = []
+    for command_config in commands:
+        command = command_config.get('command', '')
+        occurrence = seen.get(command, 0)
+        seen[command] = occurrence + 1
+        keys.append(f"{command}#{occurrence}")
+    return keys
+
+
+class QueueEntry:
+    """큐 항목 하나 (설정 + 진행 상태)"""
+
+    def __init__(self, key, config, position=0):
+        self.key = key
+        self.config = config
+        self.position = position  # 큐 안에서의 순번 (0부터, 표시용)
+        self.ordinal = 0  # 템플릿 전개 순번
+        self.source = None  # 이 항목을 만든 PlainSource / TemplateSource
+        self.sent = 0
+        self.failures = 0  # 현재 회차의 연속 실패 횟수 (재시도 판단용)
+        self.unchanged = 0  # 입력이 같아 연속으로 생략한 횟수 (로그는 처음 한 번만)
+        self.removed = False
+        self.skipped = False
+        self.runtime = False  # 제어 소켓으로 추가된 항목 (설정 파일 변경과 무관하게 유지)
+
+    @property
+    def command(self):
+        return self.config.get('command', '@2.test.md')
+
+    @property
+    def interval(self):
+        return self.config.get('interval', 10)
+
+    @property
+    def max_count(self):
+        return self.config.get('max_count', 10)
+
+    @property
+    def done(self):
+        return self.skipped or self.sent >= self.max_count
+
+
+class PlainSource:
+    """직접 적은 명령 하나"""
+
+    size = 1
+
+    def __init__(self, entry):
+        self.entry = entry
+        entry.source = self
+
+    @property
+    def entries(self):
+        return [self.entry]
+
+    def set_offset(self, offset):
+        self.entry.position = offset
+
+    def pending(self):
+        return None if self.entry.done else self.entry
+
+    def pending_after(self, entry):
+        return False
+
+    def retire(self):
+        self.entry.removed = True
+
+
+class TemplateSource:
+    """템플릿 스펙 하나: 앞에서부터 필요한 만큼만 전개하고, 앞쪽의 끝난 항목은 키만 남기고 버린다"""
+
+    def __init__(self, spec_id, spec, workspace_root, restore, finished=None, carry=None):
+        self.spec_id = spec_id
+        self.spec = spec
+        self.size = template_size(spec, workspace_root)
+        self.restore = restore
+        self.finished = finished if finished is not None else set()  # 끝나서 버린 항목의 키 (다시 전개되면 건너뜀)
+        self.carry = carry or {}  # 스펙이 바뀌기 전 전개된 항목 (같은 키로 다시 전개되면 진행 상태를 이어받음)
+        for entry in self.carry.values():
+            entry.removed = True
+        self.offset = 0
+        self.next_ordinal = 0
+        self.occurrences = Counter()  # 명령 문자열별 등장 횟수 (repeat 등으로 같은 명령이 여러 번 나올 때 구분)
+        self.iterator = expand_template(spec, workspace_root)
+        self.window = deque()
+
+    @property
+    def entries(self):
+        return list(self.window)
+
+    def set_offset(self, offset):
+        self.offset = offset
+        for entry in self.window:
+            entry.position = offset + entry.ordinal
+
+    def _pull(self):
+        while True:
+            config = next(self.iterator, None)
+            if config is None:
+                return None
+            ordinal = self.next_ordinal
+            self.next_ordinal += 1
+            command = config.get('command', '')
+            occurrence = self.occurrences[command]
+            self.occurrences[command] += 1
+            key = f"{command}#{self.spec_id}:{occurrence}"
+            if key not in self.finished:
+                break
+        entry = self.carry.pop(key, None)
+        if entry is None:
+            entry = QueueEntry(key, config)
+            self.restore(entry)
+        else:
+            entry.config = config
+            entry.removed = False
+        entry.source = self
+        entry.ordinal = ordinal
+        entry.position = self.offset + ordinal
+        self.window.append(entry)
+        return entry
+
+    def _trim(self):
+        while self.window and self.window[0].done:
+            self.finished.add(self.window.popleft().key)
+
+    def pending(self):
+        self._trim()
+        for entry in self.window:
+            if not entry.done:
+                return entry
+        while True:
+            entry = self._pull()
+            if entry is None:
+                return None
+            if not entry.done:
+                return entry
+            self._trim()
+
+    def pending_after(self, entry):
+        if any(not e.done and e.ordinal > entry.ordinal for e in self.window):
+            return True
+        while True:
+            pulled = self._pull()
+            if pulled is None:
+                return False
+            if not pulled.done:
+                return True
+
+    def retire(self):
+        for entry in itertools.chain(self.window, self.carry.values()):
+            entry.removed = True
+
+
+class CommandQueue:
+    def __init__(self, commands, workspace_root='.'):
+        self.lock = threading.Lock()
+        self.runtime_count = 0
+        self.runtime_entries = []
+        self.progress = {}  # 저널에서 복원할 진행 상태 (템플릿 항목은 전개될 때 적용)
+        self.on_restore = None
+        self.errors = []
+        self.sources = []
+        self._apply(commands, workspace_root)
+
+    def __len__(self):
+        return sum(source.size for source in self.sources) + len(self.runtime_entries)
+
+    @property
+    def entries(self):
+        """현재 메모리에 있는 항목 (템플릿은 전개된 범위만)"""
+        entries = [entry for source in self.sources for entry in source.entries]
+        return entries + self.runtime_entries
+
+    def index_of(self, entry):
+        return entry.position if entry is not None else -1
+
+    def _restore(self, entry):
+        progress = self.progress.pop(entry.key, None)
+        if progress:
+            # 결과를 확인하지 못한 전송도 보냈다고 간주 (프롬프트가 멱등이 아니므로 중복 전송 방지)
+            entry.sent = progress['dispatched']
+            entry.skipped = progress.get('skipped', False)
+            if self.on_restore:
+                self.on_restore(entry, progress)
+
+    def restore(self, progress, on_restore=None):
+        """저널에서 읽은 진행 상태를 반영 (아직 전개되지 않은 템플릿 항목은 전개될 때 반영)
+
+        실행 중에 추가되었던 명령은 같은 키로 큐 끝에 다시 추가한다
+        """
+        self.progress = dict(progress)
+        self.on_restore = on_restore
+        for key, state in progress.items():
+            if 'config' in state and '#rt' in key:
+                self.runtime_count = max(self.runtime_count, int(key.rsplit('#rt', 1)[1]))
+                self._add_runtime(key, state['config'])
+        for entry in self.entries:
+            self._restore(entry)
+
+    def next_pending(self):
+        """아직 최대 횟수만큼 전송되지 않은 첫 번째 항목"""
+        for source in self.sources:
+            entry = source.pending()
+            if entry is not None:
+                return entry
+        for entry in self.runtime_entries:
+            if not entry.done:
+                return entry
+        return None
+
+    def has_pending_after(self, entry):
+        """entry 이후에 남은 항목이 있는지 확인"""
+        if entry.runtime:
+            index = self.runtime_entries.index(entry) if entry in self.runtime_entries else -1
+            return any(not e.done for e in self.runtime_entries[index + 1:])
+        later = False
+        for source in self.sources:
+            if later:
+                if source.pending() is not None:
+                    return True
+            elif entry.source is source:
+                if source.pending_after(entry):
+                    return True
+                later = True
+        if not later:
+            return self.next_pending() is not None  # 설정에서 삭제된 항목
+        return any(not e.done for e in self.runtime_entries)
+
+    def apply(self, commands, workspace_root='.'):
+        """새 commands 목록을 반영하고 (추가, 변경, 삭제) 개수를 반환"""
+        with self.lock:
+            return self._apply(commands, workspace_root)
+
+    def _apply(self, commands, workspace_root):
+        plain = {source.entry.key: source for source in self.sources if isinstance(source, PlainSource)}
+        templates = {source.spec_id: source for source in self.sources if isinstance(source, TemplateSource)}
+        plain_keys = iter(command_keys([c for c in commands if not is_template(c)]))
+        spec_ids = iter(command_keys([{'command': c['template']} for c in commands if is_template(c)]))
+
+        sources = []
+        errors = []
+        added = changed = 0
+        for config in commands:
+            if not is_template(config):
+                key = next(plain_keys)
+                source = plain.pop(key, None)
+                if source is None:
+                    source = PlainSource(QueueEntry(key, config))
+                    self._restore(source.entry)
+                    added += 1
+                elif source.entry.config != config:
+                    # 진행 횟수는 유지하고 설정만 교체 (max_count가 줄면 바로 완료 처리됨)
+                    source.entry.config = config
+                    changed += 1
+                sources.append(source)
+                continue
+
+            spec_id = next(spec_ids)
+            try:
+                validate_template(config)
+            except ValueError as e:
+                errors.append(f"템플릿 {config.get('template')!r}: {e}")
+                continue
+            source = templates.pop(spec_id, None)
+            if source is None:
+                source = TemplateSource(spec_id, config, workspace_root, self._restore)
+                added += 1
+            elif source.spec != config:
+                # 이미 끝낸 항목은 키로 건너뛰고, 전개되어 있던 항목은 키가 같으면 진행 상태를 이어받음
+                carry = {entry.key: entry for entry in source.window}
+                source = TemplateSource(spec_id, config, workspace_root, self._restore, source.finished, carry)
+                changed += 1
+            sources.append(source)
+
+        for source in itertools.chain(plain.values(), templates.values()):
+            source.retire()
+        offset = 0
+        for source in sources:
+            source.set_offset(offset)
+            offset += source.size
+        for index, entry in enumerate(self.runtime_entries):
+            entry.position = offset + index
+        self.sources = sources
+        self.errors = errors
+        return added, changed, len(plain) + len(templates)
+
+    def enqueue(self, config):
+        """실행 중에 명령을 큐 끝에 추가"""
+        with self.lock:
+            self.runtime_count += 1
+            return self._add_runtime(f"{config.get('command', '')}#rt{self.runtime_count}", config)
+
+    def _add_runtime(self, key, config):
+        entry = QueueEntry(key, config, len(self))
+        entry.runtime = True
+        self.runtime_entries.append(entry)
+        return entry
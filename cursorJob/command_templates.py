@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+명령 템플릿
+비슷한 명령을 손으로 나열하는 대신 템플릿 + 파라미터 범위 + 파일 glob + 반복 횟수로 적는다
+전개는 제너레이터로 필요할 때마다 하나씩 만들어지므로 수만 개짜리 큐도 메모리를 거의 쓰지 않고 바로 시작한다
+
+예 (config.json의 commands 항목):
+    {"template": "@direction_{n}.md", "params": {"n": {"range": [1, 3]}}, "interval": 10, "max_count": 1}
+    {"template": "@{file} 검토", "glob": "prompts/*.md", "repeat": 2}
+    {"template": "{module}의 {goal} 개선", "params": {"module": ["parser", "cache"], "goal": ["속도", "가독성"]}}
+
+- params: 값 목록 또는 {"range": [시작, 끝(포함), 간격]}; 여러 개면 모든 조합 (뒤쪽 파라미터가 먼저 바뀜)
+- glob: 워크스페이스 루트 기준 파일 패턴, {file}(상대경로)과 {stem}(확장자 뺀 이름)으로 사용
+- repeat: 전개 전체를 몇 번 반복할지 (명령별 전송 횟수는 기존처럼 max_count)
+"""
+
+import glob
+import math
+import os
+import string
+
+TEMPLATE_KEYS = ('template', 'params', 'glob', 'repeat')
+
+
+def is_template(entry):
+    return 'template' in entry
+
+
+def _param_values(name, spec):
+    """파라미터 하나의 값 시퀀스 (range는 실제 목록을 만들지 않음)"""
+    if isinstance(spec, dict):
+        bounds = spec.get('range')
+        if not isinstance(bounds, list) or not 2 <= len(bounds) <= 3 or not all(isinstance(b, int) for b in bounds):
+            raise ValueError(f"파라미터 {name}: range는 [시작, 끝] 또는 [시작, 끝, 간격] 정수 목록이어야 합니다")
+        start, stop = bounds[0], bounds[1]
+        step = bounds[2] if len(bounds) == 3 else (1 if stop >= start else -1)
+        if step == 0 or (stop - start) * step < 0:
+            raise ValueError(f"파라미터 {name}: range 간격이 잘못되었습니다 ({bounds})")
+        return range(start, stop + (1 if step > 0 else -1), step)
+    if isinstance(spec, list) and spec:
+        return spec
+    raise ValueError(f"파라미터 {name}: 값 목록이나 range가 필요합니다")
+
+
+def _glob_files(spec, workspace_root):
+    pattern = spec.get('glob')
+    if not pattern:
+        return [None]
+    matches = sorted(glob.iglob(os.path.join(workspace_root, pattern), recursive=True))
+    return [os.path.relpath(path, workspace_root) for path in matches if os.path.isfile(path)]
+
+
+def _product(sequences):
+    """itertools.product와 같은 순서의 조합을 만들되 입력 시퀀스를 튜플로 복사하지 않음 (큰 range도 그대로 사용)"""
+    total = math.prod(len(sequence) for sequence in sequences)
+    for index in range(total):
+        combo = []
+        for sequence in reversed(sequences):
+            index, offset = divmod(index, len(sequence))
+            combo.append(sequence[offset])
+        yield tuple(reversed(combo))
+
+
+def validate_template(spec):
+    """스펙 자체만 검사 (전개 결과를 만들지 않으므로 O(스펙))"""
+    template = spec.get('template')
+    if not isinstance(template, str) or not template.strip():
+        raise ValueError("template은 비어 있지 않은 문자열이어야 합니다")
+    params = spec.get('params', {})
+    if not isinstance(params, dict):
+        raise ValueError("params는 {이름: 값} 형태여야 합니다")
+    for name, values in params.items():
+        _param_values(name, values)
+    available = set(params) | ({'file', 'stem'} if spec.get('glob') else set())
+    try:
+        fields = {field.split('.')[0].split('[')[0] for _, field, _, _ in string.Formatter().parse(template) if field}
+    except ValueError as e:
+        raise ValueError(f"template 형식 오류: {e}")
+    unknown = fields - available
+    if unknown:
+        raise ValueError(f"template에서 정의되지 않은 이름을 사용합니다: {', '.join(sorted(unknown))}")
+    repeat = spec.get('repeat', 1)
+    if not isinstance(repeat, int) or repeat < 1:
+        raise ValueError("repeat은 1 이상의 정수여야 합니다")
+
+
+def template_size(spec, workspace_root):
+    """전개될 명령 개수 (glob은 파일 목록만 확인)"""
+    params = spec.get('params', {})
+    size = math.prod(len(_param_values(name, values)) for name, values in params.items())
+    return size * len(_glob_files(spec, workspace_root)) * spec.get('repeat', 1)
+
+
+def expand_template(spec, workspace_root):
+    """템플릿 스펙을 명령 설정 dict로 하나씩 전개하는 제너레이터"""
+    base = {key: value for key, value in spec.items() if key not in TEMPLATE_KEYS}
+    params = spec.get('params', {})
+    names = list(params)
+    sequences = [_param_values(name, params[name]) for name in names]
+    for _ in range(spec.get('repeat', 1)):
+        for path in _glob_files(spec, workspace_root):
+            extra = {} if path is None else {'file': path, 'stem': os.path.splitext(os.path.basename(path))[0]}
+            for combo in _product(sequences):
+                values = dict(zip(names, combo), **extra)
+                yield dict(base, command=spec['template'].format(**values))
+
+
+def expand_commands(commands, workspace_root):
+    """일반 항목과 템플릿 항목이 섞인 commands 목록을 순서대로 전개 (잘못된 템플릿은 ValueError)"""
+    for entry in commands:
+        if is_template(entry):
+            validate_template(entry)
+            yield from expand_template(entry, workspace_root)
+        else:
+            yield entry
+
+
+def count_commands(commands, workspace_root):
+    """전개 후 명령 개수 (전개하지 않고 계산)"""
+    return sum(template_size(entry, workspace_root) if is_template(entry) else 1 for entry in commands)
+
+
+def describe(entry):
+    """로그 출력용 한 줄 설명"""
+    if not is_template(entry):
+        return f"{entry.get('command')} (간격: {entry.get('interval', 10)}초, 횟수: {entry.get('max_count', 10)}회)"
+    parts = [f"템플릿 {entry['template']}"]
+    if entry.get('params'):
+        parts.append(f"파라미터 {', '.join(entry['params'])}")
+    if entry.get('glob'):
+        parts.append(f"파일 {entry['glob']}")
+    if entry.get('repeat', 1) > 1:
+        parts.append(f"{entry['repeat']}회 반복")
+    return ', '.join(parts) + f" (간격: {entry.get('interval', 10)}초, 횟수: {entry.get('max_count', 10)}회)"
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+AI 작업 완료 감지
+고정 interval 대신 워크스페이스 파일 변경, 로그 마커 등으로 이전 프롬프트의 완료를 판단한다
+완료를 감지하지 못하면 명령별 timeout이 대체 수단으로 사용된다
+"""
+
+import os
+import re
+import time
+
+# "@direction_1.md" 형태의 참조 파일 (텍스트 맨 앞이나 공백 뒤의 @만: 메일 주소 등은 제외)
+REFERENCE_PATTERN = re.compile(r'(?:^|(?<=\s))@(\S+)')
+# 문장 끝에 붙은 문장부호는 참조에 포함하지 않음
+TRAILING_PUNCTUATION = '.,;:!?)'
+
+
+def find_references(command):
+    """명령 텍스트에서 @파일 참조 목록을 추출
+
+    >>> find_references("@direction_1.md 파일을 수정해줘")
+    ['direction_1.md']
+    >>> find_references("메일은 foo@bar.com 으로")
+    []
+    >>> find_references("@direction_1.md. 그리고 @docs/a.md, @b.md)")
+    ['direction_1.md', 'docs/a.md', 'b.md']
+    """
+    references = (ref.rstrip(TRAILING_PUNCTUATION) for ref in REFERENCE_PATTERN.findall(command))
+    return [ref for ref in references if ref]
+
+
+def file_signature(path):
+    """파일 변경 판단용 (mtime_ns, size), 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class CompletionProbe:
+    """완료 감지기 기본 인터페이스 (arm 후 is_complete를 폴링)"""
+
+    description = '없음'
+
+    def arm(self):
+        """명령 전송 직전에 호출되어 기준 상태를 기록"""
+
+    def is_complete(self):
+        return False
+
+
+class FileChangeProbe(CompletionProbe):
+    """대상 파일이 바뀐 뒤 settle초 동안 더 이상 바뀌지 않으면 완료로 판단"""
+
+    def __init__(self, paths, settle=1.0, clock=time.monotonic):
+        self.paths = list(paths)
+        self.settle = settle
+        self.clock = clock
+        self.baseline = {}
+        self.last_seen = {}
+        self.last_change = None
+        self.description = f"파일 변경 ({', '.join(os.path.basename(p) for p in self.paths)})"
+
+    def snapshot(self):
+        return {path: file_signature(path) for path in self.paths}
+
+    def arm(self):
+        self.baseline = self.snapshot()
+        self.last_seen = dict(self.baseline)
+        self.last_change = None
+
+    def is_complete(self):
+        current = self.snapshot()
+        if current != self.last_seen:
+            self.last_seen = current
+            self.last_change = self.clock()
+            return False
+        if current == self.baseline or self.last_change is None:
+            return False
+        return self.clock() - self.last_change >= self.settle
+
+
+class LogMarkerProbe(CompletionProbe):
+    """로그 파일에 전송 이후 새로 기록된 내용 중 marker가 나타나면 완료로 판단"""
+
+    def __init__(self, path, marker):
+        self.path = path
+        self.marker = marker
+        self.offset = 0
+        self.pending = ''
+        self.description = f"로그 마커 ({marker})"
+
+    def arm(self):
+        signature = file_signature(self.path)
+        self.offset = signature[1] if signature else 0
+        self.pending = ''
+
+    def is_complete(self):
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read().decode('utf-8', errors='replace')
+                self.offset = f.tell()
+        except OSError:
+            return False
+        # 마커가 청크 경계에 걸쳐도 찾을 수 있도록 앞부분 일부를 남겨둔다
+        text = self.pending + chunk
+        if self.marker in text:
+            return True
+        self.pending = text[-len(self.marker):]
+        return False
+
+
+def create_completion_probe(command_config, workspace_root):
+    """명령 설정에 맞는 완료 감지기를 생성 (감지 수단이 없으면 None)"""
+    spec = command_config.get('completion')
+    if spec is None:
+        # 기본값: 명령이 참조하는 @파일 중 존재하는 파일의 변경을 감시
+        paths = [os.path.join(workspace_root, ref) for ref in find_references(command_config.get('command', ''))]
+        paths = [path for path in paths if os.path.exists(path)]
+        return FileChangeProbe(paths) if paths else None
+
+    kind = spec.get('type', 'file_change')
+    if kind == 'file_change':
+        paths = spec.get('paths') or find_references(command_config.get('command', ''))
+        paths = [os.path.join(workspace_root, path) for path in paths]
+        return FileChangeProbe(paths, spec.get('settle', 1.0)) if paths else None
+    if kind == 'log_marker':
+        return LogMarkerProbe(os.path.join(workspace_root, spec['log_file']), spec['marker'])
+    return None
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+config.json 변경 감시
+mtime/크기를 주기적으로 확인해서 바뀌었을 때만 다시 파싱한다
+"""
+
+import json
+import os
+import time
+
+
+class ConfigWatcher:
+    def __init__(self, path, poll_interval=2.0, clock=time.monotonic):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.signature = self._signature()
+        self.next_check = 0
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self):
+        """파일이 바뀌었으면 새 설정(dict)을, 아니면 None을 반환 (파싱 오류는 ValueError)"""
+        now = self.clock()
+        if now < self.next_check:
+            return None
+        self.next_check = now + self.poll_interval
+
+        signature = self._signature()
+        if signature is None or signature == self.signature:
+            return None
+        self.signature = signature
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
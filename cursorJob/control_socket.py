@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+제어 소켓
+데몬이 Unix 도메인 소켓으로 상태 조회와 일시정지/재개/건너뛰기/명령 추가 요청을 받는다
+프로토콜: 요청 한 줄 "<명령> [인자]" -> 응답 한 줄 JSON
+"""
+
+import json
+import os
+import socket
+import threading
+
+SOCKET_PATH = "/tmp/optimized_automation.sock"
+
+
+def configured_socket_path(config_file='config.json'):
+    """config.json의 control_socket 경로 (항목이 없거나 읽을 수 없으면 기본 경로, null이면 None: 사용 안 함)"""
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return SOCKET_PATH
+    return config.get('control_socket', SOCKET_PATH) if isinstance(config, dict) else SOCKET_PATH
+
+
+class ControlServer:
+    def __init__(self, path, handler, log=None):
+        self.path = path
+        self.handler = handler  # handler(command, argument) -> dict
+        self.log = log or (lambda message: None)
+        self.server = None
+
+    def start(self):
+        """소켓을 열고 요청 처리 스레드 시작 (단일 인스턴스 잠금을 잡은 뒤 호출해야 함)"""
+        if os.path.exists(self.path):
+            os.remove(self.path)  # 이전 인스턴스가 남긴 소켓 파일
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.server.listen(8)
+        threading.Thread(target=self._serve, name='control-socket', daemon=True).start()
+        self.log(f"🎛️  제어 소켓 대기 중: {self.path}")
+
+    def _serve(self):
+        server = self.server
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # close()로 소켓이 닫힘
+            with conn:
+                conn.settimeout(2.0)
+                try:
+                    self._handle(conn)
+                except (OSError, ValueError) as e:
+                    self.log(f"⚠️  제어 요청 처리 오류: {e}")
+
+    def _handle(self, conn):
+        data = b''
+        while b'\n' not in data and len(data) < 65536:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+        line = data.decode('utf-8').strip()
+        command, _, argument = line.partition(' ')
+        try:
+            response = self.handler(command.lower(), argument.strip())
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        conn.sendall((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def close(self):
+        if self.server is None:
+            return
+        self.server.close()
+        self.server = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def send_request(line, path=SOCKET_PATH, timeout=2.0):
+    """제어 소켓에 요청 한 줄을 보내고 응답(dict)을 반환"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(path)
+        conn.sendall((line.strip() + '\n').encode('utf-8'))
+        data = b''
+        while not data.endswith(b'\n'):
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data.decode('utf-8'))
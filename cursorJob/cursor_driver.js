@@ -0,0 +1,141 @@
+// 상주형 Cursor IDE UI 드라이버 (JXA)
+// osascript -l JavaScript cursor_driver.js 로 한 번만 실행되며,
+// 표준입력으로 한 줄짜리 JSON 요청을 받아 처리하고 표준출력으로 JSON 응답을 돌려준다.
+// 스크립트는 시작 시 한 번만 컴파일되고, 명령 텍스트는 요청 파라미터로 전달된다.
+
+ObjC.import('Foundation');
+
+var systemEvents = Application('System Events');
+var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+var buffer = '';
+
+function readLine() {
+    // 요청은 ASCII로 인코딩된 JSON이므로 청크 경계에서 문자가 깨지지 않는다
+    while (true) {
+        var idx = buffer.indexOf('\n');
+        if (idx >= 0) {
+            var line = buffer.slice(0, idx);
+            buffer = buffer.slice(idx + 1);
+            return line;
+        }
+        var data = stdin.availableData;
+        if (data.length === 0) {
+            return null;  // EOF: 파이썬 쪽에서 파이프를 닫음
+        }
+        buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+    }
+}
+
+function writeLine(obj) {
+    var text = JSON.stringify(obj) + '\n';
+    stdout.writeData($(text).dataUsingEncoding($.NSUTF8StringEncoding));
+}
+
+function targetProcess(req) {
+    return systemEvents.processes.byName(req.app || 'Cursor');
+}
+
+function clickChat(req) {
+    // 채팅창 텍스트 필드를 찾아 클릭하고, 실패하면 좌표 클릭으로 대체
+    try {
+        var win = targetProcess(req).windows[0];
+        var fields = win.textFields.whose({_or: [
+            {description: {_contains: 'chat'}},
+            {description: {_contains: 'message'}},
+            {description: {_contains: 'input'}},
+            {description: {_contains: 'Ask'}}
+        ]})();
+        if (fields.length > 0) {
+            fields[0].click();
+            return 'field';
+        }
+    } catch (e) {
+        // 아래 좌표 클릭으로 진행
+    }
+    systemEvents.click({at: [req.x || 500, req.y || 600]});
+    return 'coordinates';
+}
+
+function focusWindow(req) {
+    // 제목에 req.title이 포함된 창을 맨 앞으로 (다중 워크스페이스용)
+    var windows = targetProcess(req).windows.whose({name: {_contains: req.title}})();
+    if (windows.length === 0) {
+        throw new Error('창을 찾을 수 없음: ' + req.title);
+    }
+    windows[0].actions.byName('AXRaise').perform();
+    return windows[0].name();
+}
+
+function probe(req) {
+    // 준비 상태 확인용: 최전면 앱 이름과 포커스된 요소의 역할/입력값 길이
+    var state = {frontmost: null, focused_role: null, value_length: null};
+    try {
+        state.frontmost = systemEvents.processes.whose({frontmost: true})[0].name();
+    } catch (e) {
+        return state;
+    }
+    try {
+        var focused = targetProcess(req).attributes.byName('AXFocusedUIElement').value();
+        state.focused_role = focused.role();
+        var value = focused.value();
+        state.value_length = value ? String(value).length : 0;
+    } catch (e) {
+        // 포커스된 요소가 없거나 값을 읽을 수 없음
+    }
+    return state;
+}
+
+function handle(req) {
+    switch (req.action) {
+        case 'ping':
+            return 'pong';
+        case 'activate':
+            Application(req.app || 'Cursor').activate();
+            return true;
+        case 'key':
+            if (req.modifiers && req.modifiers.length) {
+                systemEvents.keyCode(req.code, {using: req.modifiers});
+            } else {
+                systemEvents.keyCode(req.code);
+            }
+            return true;
+        case 'keystroke':
+            systemEvents.keystroke(req.text);
+            return true;
+        case 'click_chat':
+            return clickChat(req);
+        case 'focus_window':
+            return focusWindow(req);
+        case 'probe':
+            return probe(req);
+        default:
+            throw new Error('알 수 없는 요청: ' + req.action);
+    }
+}
+
+function run(argv) {
+    var line;
+    while ((line = readLine()) !== null) {
+        if (!line) {
+            continue;
+        }
+        var req;
+        try {
+            req = JSON.parse(line);
+        } catch (e) {
+            writeLine({id: null, ok: false, error: '잘못된 요청 형식: ' + line});
+            continue;
+        }
+        var res = {id: req.id};
+        try {
+            res.result = handle(req);
+            res.ok = true;
+        } catch (e) {
+            res.ok = false;
+            res.error = String(e.message || e);
+            res.code = e.errorNumber || null;
+        }
+        writeLine(res);
+    }
+}
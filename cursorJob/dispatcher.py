@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+다중 워크스페이스 병렬 디스패처
+여러 Cursor 창(워크스페이스)의 명령 목록을 동시에 실행한다
+포커스가 필요한 UI 입력 구간만 짧은 임계 구역으로 직렬화하고, AI 작업 대기 구간은 서로 겹치게 한다
+"""
+
+import os
+import threading
+import time
+
+from command_templates import count_commands, expand_commands
+from readiness import wait_until
+from retry_policy import RETRYABLE, SCOPE_COMMAND, SendFailure
+from send_cache import InputsUnchanged
+from verification import ON_FAIL_RETRY
+
+
+class Workspace:
+    """워크스페이스(창) 하나와 그 명령 목록"""
+
+    def __init__(self, name, commands, window_title=None, root=None):
+        self.name = name
+        self.commands = commands
+        self.window_title = window_title
+        self.root = root
+        self.sent = 0
+
+    @classmethod
+    def from_config(cls, entry, base_dir):
+        """config.json의 workspaces 항목 하나로부터 생성 (root는 config.json 위치 기준)"""
+        name = entry.get('name') or entry.get('window_title') or 'workspace'
+        root = os.path.normpath(os.path.join(base_dir, entry.get('workspace_root', '..')))
+        return cls(name, entry.get('commands', []), entry.get('window_title', name), root)
+
+
+class MultiWorkspaceDispatcher:
+    def __init__(self, workspaces, backend, log, is_running, completion_timeout=600, send=None, sleep=time.sleep,
+                 prepare=None, create_verifier=None, verify=None, retry_policy=None):
+        self.workspaces = workspaces
+        self.backend = backend
+        # prepare(workspace, command, command_config) -> send에 넘길 값 (참조 확인, 전송 캐시 등 잠금 밖에서 할 일)
+        # 입력이 바뀌지 않았으면 InputsUnchanged
+        self.prepare = prepare
+        # send(workspace, command, command_config, prepared) -> 성공 여부 (기본은 백엔드에 바로 전송)
+        self.send = send or (lambda workspace, command, command_config, prepared: backend.send(
+            workspace, command, command_config))
+        # create_verifier(workspace, command_config) -> 전송 전 상태를 기록한 검증기 또는 None
+        # verify(verifier, command, waited, prepared) -> VerificationResult (중단되면 None)
+        self.create_verifier = create_verifier
+        self.verify = verify
+        self.retry_policy = retry_policy  # retry_policy(command_config) -> 검증 실패 재시도(on_fail: retry) 정책
+        self.sleep = sleep  # 중단 시 바로 깨어나는 sleep을 넘겨받을 수 있음
+        self.log = log
+        self.is_running = is_running
+        self.completion_timeout = completion_timeout
+        self.ui_lock = threading.Lock()  # UI 입력(포커스) 임계 구역
+
+    def run(self):
+        """워크스페이스별 작업 스레드를 시작하고 모두 끝날 때까지 대기"""
+        threads = []
+        for workspace in self.workspaces:
+            thread = threading.Thread(target=self._run_workspace, args=(workspace,),
+                                      name=f"workspace-{workspace.name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            # 메인 스레드가 Ctrl+C를 받을 수 있도록 짧게 나눠서 대기
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+
+    def _run_workspace(self, workspace):
+        try:
+            total = count_commands(workspace.commands, workspace.root)
+        except ValueError as e:
+            self.log(f"[{workspace.name}] ❌ 명령 템플릿 오류: {e}")
+            return
+        for index, command_config in enumerate(expand_commands(workspace.commands, workspace.root)):
+            if not self.is_running():
+                return
+            command = command_config.get('command', '')
+            interval = command_config.get('interval', 10)
+            max_count = command_config.get('max_count', 10)
+            timeout = command_config.get('timeout', self.completion_timeout)
+            probe = self.backend.completion_probe(workspace, command_config)
+            self.log(f"[{workspace.name}] 🚀 명령 {index + 1}/{total} 시작: {command}")
+
+            count = 0
+            failures = 0  # 같은 회차의 연속 검증 실패 횟수
+            waiting = False  # 입력이 바뀌기를 기다리는 중 (생략 로그는 처음 한 번만)
+            while count < max_count:
+                if not self.is_running():
+                    return
+                count += 1
+                if probe:
+                    probe.arm()
+
+                # 전송 전 확인(파일 탐색, 해시)은 잠금 밖에서 다른 워크스페이스와 겹치고, UI 입력 구간만 직렬화
+                unchanged = False
+                success = False
+                verifier = prepared = None
+                try:
+                    if self.create_verifier:
+                        verifier = self.create_verifier(workspace, command_config)
+                    prepared = self.prepare(workspace, command, command_config) if self.prepare else None
+                    with self.ui_lock:
+                        success = self.send(workspace, command, command_config, prepared)
+                except InputsUnchanged:
+                    unchanged = True
+                except Exception as e:
+                    self.log(f"[{workspace.name}] 전송 중 오류: {e}")
+
+                if unchanged:
+                    # 보내지 않은 회차는 횟수에서 빼지 않고 interval 뒤 입력을 다시 확인
+                    if not waiting:
+                        self.log(f"[{workspace.name}] ⏭️  명령 {index + 1} - {count}번째 전송 생략: "
+                                 f"입력 변경 없음, 입력이 바뀔 때까지 대기")
+                    waiting = True
+                    count -= 1
+                    self.sleep(interval)
+                    continue
+                waiting = False
+                if not success:
+                    self.log(f"[{workspace.name}] ❌ 명령 {index + 1} - {count}번째 전송 실패")
+                    self.sleep(interval)
+                    continue
+                workspace.sent += 1
+                self.log(f"[{workspace.name}] ✅ 명령 {index + 1} - {count}번째 전송 성공")
+
+                # AI 작업 대기 구간은 잠금 밖에서 다른 워크스페이스와 겹친다
+                if probe:
+                    completed = wait_until(lambda: not self.is_running() or probe.is_complete(), timeout,
+                                           initial_interval=0.05, max_interval=1.0)
+                    if not completed:
+                        self.log(f"[{workspace.name}] ⏱️  작업 완료 감지 시간 초과 ({timeout}초)")
+
+                result = None
+                if verifier and self.verify and self.is_running():
+                    result = self.verify(verifier, command, probe is not None, prepared)
+                if result is not None and not result.passed and verifier.on_fail == ON_FAIL_RETRY and self.retry_policy:
+                    # 프롬프트가 반영되지 않음: 재시도 정책에 따라 같은 회차를 다시 보냄
+                    failures += 1
+                    policy = self.retry_policy(command_config)
+                    failure = SendFailure(RETRYABLE, f"결과 검증 실패 ({result.describe()})", SCOPE_COMMAND)
+                    if policy.should_retry(failure, failures):
+                        count -= 1
+                        delay = policy.delay(failures)
+                        self.log(f"[{workspace.name}] 🔁 {delay:.1f}초 후 재시도 ({failures}/{policy.max_attempts - 1})")
+                        self.sleep(delay)
+                        continue
+                    self.log(f"[{workspace.name}]    재시도 {policy.max_attempts - 1}회 모두 실패 - 이번 회차는 실패로 처리합니다")
+                failures = 0
+                if not probe and count < max_count:
+                    self.sleep(interval)
+
+        self.log(f"[{workspace.name}] 🎉 모든 명령 실행 완료! (총 {workspace.sent}회 전송)")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+단일 인스턴스 잠금
+flock으로 잠근 잠금 파일에 PID와 시작 시간을 기록한다
+전체 프로세스의 cmdline을 훑지 않고 O(1)로 실행 중인 인스턴스를 찾는다
+잠금이 걸려있지 않은 파일은 이전 프로세스가 비정상 종료하고 남긴 것(stale)이다
+"""
+
+import fcntl
+import json
+import os
+import signal
+import time
+
+from readiness import wait_until
+
+
+def read_lock_info(path):
+    """잠금 파일에 기록된 {'pid', 'start_time'} (없거나 읽을 수 없으면 None)"""
+    try:
+        with open(path, 'r') as f:
+            return json.loads(f.read() or 'null')
+    except (OSError, ValueError):
+        return None
+
+
+def probe_lock(path):
+    """잠금을 잡고 있는 프로세스 정보를 반환 (아무도 잡고 있지 않으면 None)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return read_lock_info(path) or {}
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)  # 잡을 수 있었다 = stale 잠금 파일
+        return None
+    finally:
+        os.close(fd)
+
+
+def process_start_time(pid):
+    """프로세스 시작 시간 (PID 재사용 확인용, 알 수 없으면 None)"""
+    try:
+        import psutil
+        return psutil.Process(pid).create_time()
+    except Exception:
+        return None
+
+
+def signal_holder(info, signum):
+    """잠금 보유 프로세스에 시그널 전송 (PID가 다른 프로세스에 재사용된 경우는 건너뜀)"""
+    pid = info.get('pid')
+    if not pid:
+        return False
+    started = process_start_time(pid)
+    if started is not None and info.get('start_time') and abs(started - info['start_time']) > 1.0:
+        return False
+    try:
+        os.kill(pid, signum)
+        return True
+    except ProcessLookupError:
+        return False
+
+
+class InstanceLock:
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def _try_lock(self):
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def acquire(self, takeover=True, timeout=5.0, log=print):
+        """잠금 획득 (takeover면 기존 보유자에 종료를 요청하고 잠금이 풀릴 때까지 대기)"""
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not self._try_lock():
+            holder = read_lock_info(self.path) or {}
+            if not takeover:
+                os.close(self.fd)
+                self.fd = None
+                return False
+
+            log(f"🔍 기존 프로세스 발견: PID {holder.get('pid', '?')}")
+            signal_holder(holder, signal.SIGTERM)
+            # 고정 시간 대기 대신 기존 프로세스가 잠금을 놓는 즉시 진행
+            if wait_until(self._try_lock, timeout, max_interval=0.1):
+                log(f"✅ 프로세스 {holder.get('pid', '?')} 중단 완료")
+            else:
+                signal_holder(holder, signal.SIGKILL)
+                if not wait_until(self._try_lock, timeout, max_interval=0.1):
+                    os.close(self.fd)
+                    self.fd = None
+                    return False
+                log(f"⚠️  프로세스 {holder.get('pid', '?')} 강제 종료")
+
+        info = {'pid': os.getpid(), 'start_time': process_start_time(os.getpid()) or time.time()}
+        os.ftruncate(self.fd, 0)
+        os.pwrite(self.fd, json.dumps(info).encode('utf-8'), 0)
+        return True
+
+    def release(self):
+        """잠금 해제 (파일은 남겨둔다: 지우면 다른 프로세스와 경쟁 상태가 생길 수 있음)"""
+        if self.fd is None:
+            return False
+        os.ftruncate(self.fd, 0)
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+        return True
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+데몬 모드용 로그 기록기
+전송 경로에서 파일 I/O를 하지 않도록 큐에 넣고 백그라운드 스레드가 모아서 기록한다
+파일 크기가 커지면 .1, .2 ... 로 순환시키고, 마지막 몇 줄은 파일 끝에서부터 읽는다
+"""
+
+import atexit
+import os
+import queue
+import threading
+
+_FLUSH = object()
+
+
+class AsyncLogWriter:
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backup_count=3, flush_interval=0.5, batch_size=256):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.pid = None
+        self.queue = None
+        self.thread = None
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_thread(self):
+        # fork 이후에는 부모의 스레드가 없으므로 현재 프로세스에서 새로 시작
+        if self.pid == os.getpid() and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.pid == os.getpid() and self.thread.is_alive():
+                return
+            self.pid = os.getpid()
+            self.queue = queue.Queue()
+            self.thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+            self.thread.start()
+
+    def write(self, line):
+        """한 줄을 기록 대기열에 추가 (즉시 반환)"""
+        self._ensure_thread()
+        self.queue.put(line)
+
+    def flush(self, timeout=5.0):
+        """대기 중인 로그가 모두 파일에 기록될 때까지 대기 (fork 직전, 종료 시 사용)"""
+        if self.pid != os.getpid() or self.thread is None or not self.thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put((_FLUSH, done))
+        done.wait(timeout)
+
+    def close(self):
+        self.flush()
+
+    def _run(self):
+        pending = []
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            waiter = None
+            if isinstance(item, tuple) and item[0] is _FLUSH:
+                waiter = item[1]
+            elif item is not None:
+                pending.append(item)
+                # 한꺼번에 들어온 줄은 모아서 한 번에 기록
+                while len(pending) < self.batch_size:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, tuple) and item[0] is _FLUSH:
+                        waiter = item[1]
+                        break
+                    pending.append(item)
+
+            if pending:
+                try:
+                    self._write_batch(pending)
+                except OSError:
+                    pass  # 로그 실패로 자동화가 멈추지 않도록 무시
+                pending = []
+            if waiter is not None:
+                waiter.set()
+
+    def _write_batch(self, lines):
+        data = ''.join(line + '\n' for line in lines)
+        if self.max_bytes:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                size = 0
+            if size and size + len(data.encode('utf-8')) > self.max_bytes:
+                self._rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+
+    def _rotate(self):
+        """log -> log.1 -> log.2 ... (backup_count 개까지만 보관)"""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+def tail_lines(path, count=5, block_size=4096):
+    """파일 끝에서부터 블록 단위로 읽어 마지막 count줄을 반환 (파일 크기와 무관하게 빠름)"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    return lines[-count:]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+전송 단계별 지연 시간 측정
+activate / focus / keystroke / submit / wait_completion 단계를 명령별 히스토그램에 모으고
+p50/p95/p99 요약과 Prometheus 텍스트 형식 내보내기를 제공한다
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PHASES = ('activate', 'focus', 'keystroke', 'submit', 'send', 'wait_completion')
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+METRIC_NAME = 'cursor_automation_phase_seconds'
+
+
+class Histogram:
+    """누적 버킷(내보내기용)과 최근 샘플(정확한 백분위수용)을 함께 보관"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=1024):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def quantile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': round(self.sum / self.count, 4) if self.count else None,
+            'p50': _round(self.quantile(0.50)),
+            'p95': _round(self.quantile(0.95)),
+            'p99': _round(self.quantile(0.99)),
+            'max': round(self.max, 4),
+        }
+
+
+def _round(value):
+    return None if value is None else round(value, 4)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class LatencyMetrics:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.histograms = {}  # (phase, command) -> Histogram
+        self.on_observe = None  # 기록할 때마다 호출 (phase, command, seconds) - 실행 트레이스용
+
+    def observe(self, phase, command, seconds):
+        with self.lock:
+            histogram = self.histograms.get((phase, command))
+            if histogram is None:
+                histogram = self.histograms[(phase, command)] = Histogram()
+            histogram.observe(seconds)
+        if self.on_observe:
+            self.on_observe(phase, command, seconds)
+
+    @contextmanager
+    def phase(self, phase, command):
+        """with 블록의 소요 시간을 해당 단계에 기록 (예외가 나도 기록)"""
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(phase, command, self.clock() - started)
+
+    def summary(self):
+        """{명령: {단계: {count, mean, p50, p95, p99, max}}}"""
+        with self.lock:
+            result = {}
+            for (phase, command), histogram in sorted(self.histograms.items(), key=lambda item: item[0][1]):
+                result.setdefault(command, {})[phase] = histogram.summary()
+            return result
+
+    def overall(self, phase):
+        """모든 명령을 합친 단계별 요약"""
+        with self.lock:
+            merged = Histogram()
+            for (name, _), histogram in self.histograms.items():
+                if name != phase:
+                    continue
+                merged.count += histogram.count
+                merged.sum += histogram.sum
+                merged.max = max(merged.max, histogram.max)
+                merged.recent.extend(histogram.recent)
+            return merged.summary()
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식 (histogram + 최근 샘플 기준 분위수)"""
+        lines = [
+            f"# HELP {METRIC_NAME} Cursor 자동화 전송 단계별 소요 시간",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        quantiles = []
+        with self.lock:
+            for (phase, command), histogram in sorted(self.histograms.items()):
+                labels = f'phase="{_label(phase)}",command="{_label(command)}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'{METRIC_NAME}_sum{{{labels}}} {histogram.sum:.6f}')
+                lines.append(f'{METRIC_NAME}_count{{{labels}}} {histogram.count}')
+                for q in (0.5, 0.95, 0.99):
+                    value = histogram.quantile(q)
+                    if value is not None:
+                        quantiles.append(f'{METRIC_NAME}_quantile{{{labels},quantile="{q}"}} {value:.6f}')
+        if quantiles:
+            lines.append(f"# TYPE {METRIC_NAME}_quantile gauge")
+            lines.extend(quantiles)
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """텍스트 파일로 내보내기 (node_exporter textfile collector 등에서 읽을 수 있도록 원자적으로 교체)"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
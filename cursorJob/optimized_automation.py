@@ -5,30 +5,55 @@ UI 요소를 한 번 찾아서 재사용하는 방식
 """
 
 import time
-import subprocess
-import psutil
 import os
 import sys
 import signal
+import threading
 import argparse
 import json
 from datetime import datetime
 
+from backends import SimulatedBackend, create_backend
+from calibration import DEFAULT_PROFILE, DelayCalibrator
+from command_queue import CommandQueue, command_keys
+from command_templates import describe
+from config_watcher import ConfigWatcher
+from control_socket import SOCKET_PATH, ControlServer, configured_socket_path, send_request
+from dispatcher import MultiWorkspaceDispatcher, Workspace
+from instance_lock import InstanceLock, probe_lock, signal_holder
+from log_writer import AsyncLogWriter, tail_lines
+from metrics import LatencyMetrics
+from progress_journal import ProgressJournal
+from prompt_input import ClipboardStager, ClipboardUnavailable, build_prompt
+from scheduler import FIXED_RATE, SCHEDULE_MODES, CronSpec, Job, Scheduler, next_deadline
+from session_trace import NullTrace, create_trace
+from send_cache import DEFAULT_EXCLUDE, InputsUnchanged, MissingReferenceError, SendCache, resolve_references
+from retry_policy import SCOPE_COMMAND, CircuitBreaker, RetryPolicy, SendFailure, RETRYABLE, classify_error
+from readiness import (STAGE_ACTIVATED, STAGE_CHAT_FOCUSED, STAGE_SUBMITTED, STAGE_TYPED,
+                       create_readiness_probe, wait_until)
+from ui_driver import UIDriver
+from verification import ON_FAIL_RETRY, WorkspaceWatcher, create_verifier
+
+LOCK_FILE = "/tmp/optimized_automation.lock"
+
 class OptimizedCursorAutomation:
-    def __init__(self, daemon_mode=False):
+    def __init__(self, daemon_mode=False, resume=True, config=None, calibrate=False):
         self.daemon_mode = daemon_mode
-        self.config_file = "config.json"
-        self.script_name = "optimized_automation.py"
-        self.pid_file = "/tmp/optimized_automation.pid"
+        self.resume = resume  # False면 이전 진행 기록을 무시하고 처음부터 실행
+        self.config_file = os.path.abspath("config.json")  # 데몬 모드에서 chdir('/') 이후에도 감시할 수 있도록 절대경로
         self.log_file = "/tmp/optimized_automation.log"
+        self.log_writer = AsyncLogWriter(self.log_file)  # 데몬 모드 로그는 백그라운드 스레드가 모아서 기록
         self.running = True
         
-        # config 로드
-        self.config = self.load_config()
-        self.commands = self.config.get('commands', [])  # 명령 목록
+        # config 로드 (벤치마크 등에서는 설정 dict를 직접 전달)
+        self.config = self.load_config() if config is None else config
+        self.lock_file = self.config.get('lock_file', LOCK_FILE)
+        self.instance_lock = InstanceLock(self.lock_file)  # PID와 시작 시간을 기록하는 flock 잠금
+        self.log_writer.max_bytes = self.config.get('log_max_bytes', self.log_writer.max_bytes)
+        self.log_writer.backup_count = self.config.get('log_backup_count', self.log_writer.backup_count)
+        self.commands = self.config.get('commands', [])  # 명령 목록 (템플릿 항목은 실행 큐에서 필요할 때 전개)
         self.current_command_index = 0  # 현재 실행 중인 명령 인덱스
         self.count = 0
-        self.total_commands = len(self.commands)
         
         # 첫 번째 명령이 있으면 기본값으로 설정
         if self.commands:
@@ -47,22 +72,142 @@ class OptimizedCursorAutomation:
                 'command': self.command
             }
         
-        # 딜레이 설정 (설정 파일에서 가져오거나 기본값 사용)
-        self.delays = {
-            'activation': self.config.get('activation_delay', 0.5),
-            'keystroke': self.config.get('keystroke_delay', 0.5),
-            'enter': self.config.get('enter_delay', 0.3),
-            'final': self.config.get('final_delay', 1.0),
-            'chat_click': self.config.get('chat_click_delay', 0.3)
+        # 딜레이 자동 보정 (호스트별로 학습한 값은 보정 모드가 아니어도 적용)
+        self.calibrating = calibrate or self.config.get('calibrate_delays', False)
+        self.delay_profile_file = self.config.get('delay_profile_file', DEFAULT_PROFILE)
+        self.calibrator = None
+        if self.delay_profile_file:
+            self.calibrator = DelayCalibrator(self.delay_profile_file,
+                                              self.config.get('calibration_step', 0.05),
+                                              self.config.get('calibration_backoff', 1.5),
+                                              self.config.get('calibration_min_delay', 0.05),
+                                              margin=self.config.get('calibration_margin', 2.0),
+                                              min_samples=self.config.get('calibration_min_samples', 10),
+                                              save_interval=self.config.get('calibration_save_interval', 30.0))
+        self.ui_latency = {}  # 마지막 전송에서 딜레이별 준비까지 걸린 시간 (시간 초과면 None, UI 상태 확인 가능할 때)
+        self.ui_outcome = {}  # UI 상태로 확인할 수 없어 작업 완료 여부로 판단할 딜레이 (고정 대기)
+        self.ready_elapsed = 0.0  # 마지막 wait_ready 소요 시간
+        self.pending_calibration = []  # 작업 완료 여부로 판단할 딜레이 키
+        
+        # 회로 차단기 (연속 실패 시 큐 전체를 멈추고 가벼운 상태 확인으로 복구 여부 판단)
+        self.breaker = CircuitBreaker()
+        self.last_failure = None  # 마지막 전송 실패 분류 (SendFailure)
+        
+        # 전송 결과 검증 (워크스페이스 루트별 증분 스냅샷)
+        self.watchers = {}
+        self.verification = {'passed': 0, 'failed': 0, 'last': None}
+        self.last_digest = None  # 마지막 성공 전송의 입력 해시 (검증 실패 시 전송 캐시에서 취소)
+        
+        self.apply_settings(self.config)
+        if self.calibrator and self.calibrator.learned:
+            learned = ', '.join(f"{key}={value}" for key, value in sorted(self.calibrator.learned.items()))
+            self.log_message(f"📐 학습된 딜레이 적용 ({self.calibrator.host}): {learned}")
+        self.queue = CommandQueue(self.commands, self.workspace_root)  # 진행 상태를 포함한 실행 큐
+        self.total_commands = len(self.queue)
+        for error in self.queue.errors:
+            self.log_message(f"❌ 명령 템플릿 오류 (건너뜀): {error}")
+        
+        # config.json 변경 감시 (재시작 없이 명령 목록/딜레이 반영)
+        self.config_watch_enabled = self.config.get('config_watch', True)
+        self.config_watcher = ConfigWatcher(self.config_file, self.config.get('config_watch_interval', 2.0))
+        
+        # 진행 상태 저널 (비정상 종료 후 재시작 시 중단된 위치부터 이어서 실행)
+        self.journal_enabled = self.config.get('journal_enabled', True)
+        self.journal_file = self.config.get('journal_file', '/tmp/optimized_automation.journal')
+        self.journal = None
+        
+        # 제어 소켓 (상태 조회, 일시정지/재개, 건너뛰기, 실행 중 명령 추가)
+        self.control_socket_path = self.config.get('control_socket', SOCKET_PATH)
+        self.control_server = None
+        self.paused = False
+        self.current_entry = None
+        self.next_fire_time = None
+        
+        # 전송 단계별 소요 시간 (명령별 히스토그램, Prometheus 텍스트 파일로 내보내기)
+        self.metrics = LatencyMetrics()
+        self.metrics_file = self.config.get('metrics_file', '/tmp/optimized_automation.prom')
+        
+        # 실행 트레이스 (NDJSON, trace_replay.py로 분석/재실행), 잠금을 잡은 뒤 run_automation에서 시작
+        self.trace = create_trace(self.config)
+        self.metrics.on_observe = lambda phase, command, seconds: self.trace.emit(
+            'phase', phase=phase, cmd=command, dur=round(seconds, 6))
+        
+        # 상주형 UI 드라이버 (run_automation에서 시작, 데몬 fork 이후에 생성되어야 함)
+        self.target_app = self.config.get('target_app', 'Cursor')
+        self.ui_driver_command = self.config.get('ui_driver_command')
+        self.ui_driver = None
+        self.clipboard = None  # paste 입력용, 처음 필요할 때 생성
+        
+        # UI 준비 상태 감지기 (설정된 딜레이는 상한 타임아웃으로만 사용)
+        self.readiness_probe = create_readiness_probe(self.config, self.get_ui_driver, self.target_app)
+        
+        # UI 백엔드 (실제 Cursor 창 또는 가상 IDE)와 단일 창 실행용 기본 워크스페이스
+        self.backend = create_backend(self.config, self)
+        self.workspace = Workspace('default', self.commands, root=self.workspace_root)
+        self.startup_delay = self.config.get('startup_delay', 1.0)
+        self.idle_seconds = 0.0  # 다음 예정 시각까지 대기한 누적 시간 (벤치마크용)
+        
+        # 절대 시각 기반 스케줄러 (실행 큐 작업 하나 + 벽시계 기준 주기 명령들)
+        self.scheduler = Scheduler()
+        self.scheduler.on_schedule = lambda job, deadline: self.trace.emit(
+            'schedule', job=job.name, at=self.trace.at(deadline))
+        self.queue_job = Job('queue')
+        self.breaker_job = Job('circuit_breaker')  # 회로가 열린 동안 복구 확인 예약
+        self.periodic_jobs = []
+        
+        # 전송 생략 캐시 (@파일을 참조하는 명령만: 명령, 참조 파일 내용, 워크스페이스 상태가 마지막 성공 전송과 같으면 생략)
+        # 기본은 꺼짐 - 입력 해시는 전송 직후 기록되므로 AI가 파일을 고치기 전에 다음 회차가 오면 생략됨
+        self.send_cache = None
+        if self.config.get('send_cache_enabled', False):
+            self.send_cache = SendCache(self.config.get('send_cache_file', '/tmp/optimized_automation.sendcache'),
+                                        self.config.get('send_cache_workspace_state', True),
+                                        self.config.get('send_cache_exclude', DEFAULT_EXCLUDE))
+            if not self.resume:
+                self.send_cache.clear()
+    
+    def apply_settings(self, config):
+        """딜레이 등 명령 목록 외의 설정값을 반영 (시작 시와 설정 파일 변경 시 호출)"""
+        # 딜레이 설정 (설정 파일에서 가져오거나 기본값 사용, 학습된 프로필이 있으면 그 값을 사용)
+        self.configured_delays = {
+            'activation': config.get('activation_delay', 0.5),
+            'keystroke': config.get('keystroke_delay', 0.5),
+            'enter': config.get('enter_delay', 0.3),
+            'final': config.get('final_delay', 1.0),
+            'chat_click': config.get('chat_click_delay', 0.3)
         }
+        self.delays = (self.calibrator.effective(self.configured_delays) if self.calibrator
+                       else dict(self.configured_delays))
         
         # 채팅창 포커스 설정
-        self.chat_focus_enabled = self.config.get('chat_focus_enabled', True)
-        self.chat_click_coordinates = self.config.get('chat_click_coordinates', [400, 700])
-        self.fallback_shortcut = self.config.get('fallback_keyboard_shortcut', 'Cmd+L')
+        self.chat_focus_enabled = config.get('chat_focus_enabled', True)
+        self.chat_click_coordinates = config.get('chat_click_coordinates', [400, 700])
+        self.fallback_shortcut = config.get('fallback_keyboard_shortcut', 'Cmd+L')
         
         # 명령 간 대기시간 설정
-        self.command_interval_delay = self.config.get('command_interval_delay', 2.0)
+        self.command_interval_delay = config.get('command_interval_delay', 2.0)
+        
+        # 반복 간격 기준: fixed_rate(예정 시각 기준, 밀리지 않음) 또는 fixed_delay(전송이 끝난 뒤부터)
+        self.schedule_mode = config.get('schedule_mode', FIXED_RATE)
+        if self.schedule_mode not in SCHEDULE_MODES:
+            self.schedule_mode = FIXED_RATE
+        self.error_retry_delay = config.get('error_retry_delay', 5.0)
+        
+        # 전송 실패 재시도 (지수 백오프 + 지터, 명령별 "retry"로 덮어쓰기 가능)와 회로 차단기
+        self.retry_config = config.get('retry', {})
+        self.retry_policy = RetryPolicy.from_config(self.retry_config, self.error_retry_delay)
+        self.breaker.configure_from(config.get('circuit_breaker', {}))
+        
+        # AI 작업 완료 감지 설정 (워크스페이스 루트는 config.json 위치 기준 상대경로)
+        self.config_dir = os.path.dirname(os.path.abspath(self.config_file))
+        self.workspace_root = os.path.normpath(
+            os.path.join(self.config_dir, config.get('workspace_root', '..')))
+        self.completion_timeout = config.get('completion_timeout', 600)
+        # 준비 상태/완료/검증 폴링 간격 배율 (배속 재실행에서 1/배속으로 줄여 폴링 오차가 부풀려지지 않게 함)
+        self.poll_scale = config.get('poll_scale', 1.0)
+        
+        # 입력 방식: keystroke(글자 단위 입력) 또는 paste(클립보드로 한 번에 붙여넣기)
+        self.input_mode = config.get('input_mode', 'keystroke')
+        self.inline_file_refs = config.get('inline_file_refs', False)
     
     def load_config(self):
         """config.json 파일에서 설정을 로드"""
@@ -85,44 +230,241 @@ class OptimizedCursorAutomation:
             self.log_message("기본값을 사용합니다.")
             return {}
     
+    def check_config_reload(self):
+        """config.json이 바뀌었으면 다시 읽어서 실행 중인 큐와 설정에 반영"""
+        if not self.config_watch_enabled:
+            return
+        try:
+            config = self.config_watcher.poll()
+        except (OSError, ValueError) as e:
+            self.log_message(f"❌ 설정 파일 다시 읽기 실패 (기존 설정 유지): {e}")
+            return
+        if config is None:
+            return
+        
+        self.config = config
+        self.apply_settings(config)
+        self.workspace.root = self.workspace_root
+        self.commands = config.get('commands', [])
+        added, changed, removed = self.queue.apply(self.commands, self.workspace_root)
+        self.total_commands = len(self.queue)
+        for error in self.queue.errors:
+            self.log_message(f"❌ 명령 템플릿 오류 (건너뜀): {error}")
+        self.log_message(f"🔄 설정 파일 변경 반영: 추가 {added}개, 변경 {changed}개, 삭제 {removed}개 (진행 상태 유지)")
+        self.trace.emit('reload', added=added, changed=changed, removed=removed)
+        
+        # 새로 추가된 명령이나 바뀐 주기 명령을 반영하도록 스케줄 갱신
+        if not self.queue_job.scheduled and self.queue.next_pending() is not None:
+            self.scheduler.schedule(self.queue_job, time.monotonic())
+        self.schedule_periodic()
+        self.scheduler.wake()
+    
+    def wait_for_job(self, job):
+        """job의 예정 시각까지 대기하면서 설정 파일 변경을 확인 (제어 요청/중단으로 깨어나면 False)"""
+        started = time.monotonic()
+        if job.wall_time is not None:
+            self.next_fire_time = job.wall_time
+        elif job.deadline is not None:
+            self.next_fire_time = time.time() + max(job.deadline - started, 0)
+        due = False
+        try:
+            due = self.scheduler.wait_for(job, on_tick=self.check_config_reload)
+            return due
+        finally:
+            self.next_fire_time = None
+            elapsed = time.monotonic() - started
+            self.idle_seconds += elapsed
+            self.trace.emit('wait', job=job.name, dur=round(elapsed, 6), due=due)
+    
+    def wait_while_paused(self):
+        """제어 소켓으로 일시정지된 동안 대기"""
+        if not self.paused:
+            return
+        self.log_message("⏸️  일시정지됨 - resume 요청을 기다립니다")
+        started = time.monotonic()
+        while self.paused and self.running:
+            self.check_config_reload()
+            time.sleep(0.2)
+        self.trace.emit('pause', dur=round(time.monotonic() - started, 6))
+    
+    def export_metrics(self):
+        """단계별 소요 시간을 Prometheus 텍스트 파일로 내보내기"""
+        if not self.metrics_file:
+            return
+        try:
+            self.metrics.export(self.metrics_file)
+        except OSError as e:
+            self.log_message(f"⚠️  지표 파일 기록 실패: {e}")
+    
+    def start_control_server(self):
+        """제어 소켓 열기 (단일 인스턴스 잠금을 잡은 뒤 호출)"""
+        if not self.control_socket_path:
+            return
+        try:
+            self.control_server = ControlServer(self.control_socket_path, self.handle_control, self.log_message)
+            self.control_server.start()
+        except OSError as e:
+            self.log_message(f"⚠️  제어 소켓을 열 수 없습니다: {e}")
+            self.control_server = None
+    
+    def close_control_server(self):
+        """제어 소켓 닫기"""
+        if self.control_server is not None:
+            self.control_server.close()
+            self.control_server = None
+    
+    def status_snapshot(self):
+        """현재 진행 상태 (제어 소켓 status 응답)"""
+        entry = self.current_entry
+        return {
+            'pid': os.getpid(),
+            'paused': self.paused,
+            'current_index': self.queue.index_of(entry) + 1 if entry else 0,
+            'total_commands': len(self.queue),
+            'command': entry.command if entry else None,
+            'count': entry.sent if entry else 0,
+            'max_count': entry.max_count if entry else 0,
+            'next_fire': (datetime.fromtimestamp(self.next_fire_time).strftime('%Y-%m-%d %H:%M:%S')
+                          if self.next_fire_time else None),
+            'periodic': [{'command': job.payload[0].get('command'), 'count': job.count,
+                          'next_fire': datetime.fromtimestamp(job.wall_time).strftime('%Y-%m-%d %H:%M:%S')
+                          if job.wall_time else None} for job in list(self.periodic_jobs)],
+            'circuit_breaker': self.breaker.snapshot(),
+            'verification': dict(self.verification),
+            'send_latency': self.metrics.overall('send'),
+            'latency': self.metrics.summary(),
+        }
+    
+    def handle_control(self, command, argument):
+        """제어 소켓 요청 처리 (소켓 스레드에서 호출됨)"""
+        if command not in ('status', 'metrics'):
+            self.trace.emit('control', request=command)
+        if command == 'status':
+            return dict(self.status_snapshot(), ok=True)
+        if command == 'metrics':
+            return {'ok': True, 'prometheus': self.metrics.render_prometheus()}
+        if command == 'pause':
+            self.paused = True
+            self.log_message("⏸️  제어 요청: 일시정지")
+            return {'ok': True, 'paused': True}
+        if command == 'resume':
+            self.paused = False
+            if self.breaker.is_open:
+                self.scheduler.schedule(self.breaker_job, time.monotonic())  # 기다리지 않고 바로 상태 확인
+                self.scheduler.wake()
+            self.log_message("▶️  제어 요청: 재개")
+            return {'ok': True, 'paused': False}
+        if command == 'skip':
+            entry = self.current_entry
+            if entry is None or entry.done:
+                return {'ok': False, 'error': '건너뛸 명령이 없습니다'}
+            self.skip_entry(entry)
+            if self.queue_job.scheduled:
+                self.scheduler.schedule(self.queue_job, time.monotonic())  # 대기 중이면 바로 다음 명령으로
+                self.scheduler.wake()
+            self.log_message(f"⏭️  제어 요청: 명령 건너뛰기 ({entry.command})")
+            return {'ok': True, 'skipped': entry.command}
+        if command == 'enqueue':
+            config = json.loads(argument) if argument.startswith('{') else {'command': argument}
+            if not config.get('command'):
+                return {'ok': False, 'error': '추가할 명령이 비어 있습니다'}
+            config.setdefault('interval', 10)
+            config.setdefault('max_count', 1)
+            entry = self.queue.enqueue(config)
+            if self.journal:
+                self.journal.enqueue(entry.key, config)
+            self.total_commands = len(self.queue)
+            if not self.queue_job.scheduled:
+                self.scheduler.schedule(self.queue_job, time.monotonic())  # 큐가 끝난 뒤 추가된 경우
+                self.scheduler.wake()
+            self.log_message(f"➕ 제어 요청: 명령 추가 ({entry.command}, {entry.max_count}회)")
+            return {'ok': True, 'key': entry.key, 'position': len(self.queue)}
+        return {'ok': False, 'error': f"알 수 없는 요청: {command}"}
+    
+    def skip_entry(self, entry):
+        """명령을 건너뛰고 저널에 기록 (재시작해도 남은 횟수를 다시 보내지 않음)"""
+        entry.skipped = True
+        if self.journal:
+            self.journal.skip(entry.key)
+    
+    def open_journal(self):
+        """진행 상태 저널을 열고, 이전 실행이 중단된 위치를 실행 큐에 복원"""
+        if not self.journal_enabled:
+            return
+        self.journal = ProgressJournal(self.journal_file,
+                                       self.config.get('journal_fsync_batch', 8),
+                                       self.config.get('journal_compact_threshold', 1000))
+        if not self.resume:
+            self.journal.complete()
+            self.log_message("🧹 이전 진행 기록을 무시하고 처음부터 시작합니다")
+            return
+        
+        # 템플릿으로 전개되는 항목은 실제로 전개될 때 복원됨, 실행 중에 추가되었던 명령은 큐 끝에 다시 추가됨
+        self.queue.restore(self.journal.replay(), self.log_restored)
+        self.total_commands = len(self.queue)
+    
+    def log_restored(self, entry, progress):
+        """저널에서 진행 상태를 복원한 항목 로그"""
+        if entry.skipped:
+            self.log_message(f"♻️  이전 진행 상태 복원: {entry.command} (건너뜀, {entry.sent}/{entry.max_count}회)")
+            return
+        self.log_message(f"♻️  이전 진행 상태 복원: {entry.command} ({entry.sent}/{entry.max_count}회)")
+        if progress['dispatched'] > progress['acked']:
+            self.log_message(f"   ⚠️  결과 미확인 전송 {progress['dispatched'] - progress['acked']}건은 전송된 것으로 간주합니다")
+    
+    def open_trace(self):
+        """실행 트레이스 시작 (스케줄링 관련 설정을 첫 레코드에 기록)"""
+        try:
+            self.trace.open(settings={
+                'schedule_mode': self.schedule_mode,
+                'command_interval_delay': self.command_interval_delay,
+                'completion_timeout': self.completion_timeout,
+                'error_retry_delay': self.error_retry_delay,
+                'startup_delay': self.startup_delay,
+                'retry': self.retry_config,
+                'circuit_breaker': self.config.get('circuit_breaker', {}),
+                'delays': self.delays,
+                'workspaces': [entry.get('name') or entry.get('window_title') or 'workspace'
+                               for entry in self.config.get('workspaces') or []],
+            })
+        except OSError as e:
+            self.log_message(f"⚠️  트레이스 파일을 열 수 없습니다: {e}")
+            self.trace = NullTrace()
+    
+    def close_journal(self):
+        """저널 버퍼를 디스크에 반영하고 닫기"""
+        if self.journal is not None:
+            self.journal.close()
+    
     def log_message(self, message):
         """로그 메시지 출력 (daemon 모드에서는 파일로, 일반 모드에서는 콘솔로)"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         log_msg = f"[{timestamp}] {message}"
         
         if self.daemon_mode:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_msg + '\n')
+            self.log_writer.write(log_msg)
         else:
             print(log_msg)
     
-    def write_pid_file(self):
-        """PID 파일 생성"""
-        try:
-            with open(self.pid_file, 'w') as f:
-                f.write(str(os.getpid()))
-            self.log_message(f"PID 파일 생성: {self.pid_file}")
-        except Exception as e:
-            self.log_message(f"PID 파일 생성 오류: {e}")
-    
-    def remove_pid_file(self):
-        """PID 파일 삭제"""
+    def release_instance_lock(self):
+        """단일 인스턴스 잠금 해제"""
         try:
-            if os.path.exists(self.pid_file):
-                os.remove(self.pid_file)
-                self.log_message("PID 파일 삭제 완료")
+            if self.instance_lock.release():
+                self.log_message("잠금 해제 완료")
         except Exception as e:
-            self.log_message(f"PID 파일 삭제 오류: {e}")
+            self.log_message(f"잠금 해제 오류: {e}")
     
     def signal_handler(self, signum, frame):
-        """시그널 핸들러 (중단 신호 처리)"""
+        """시그널 핸들러: 진행 중인 대기를 취소하고, 정리는 run_automation이 마무리"""
         self.log_message(f"시그널 {signum} 수신 - 종료 중...")
         self.running = False
-        self.remove_pid_file()
-        sys.exit(0)
+        self.scheduler.cancel()
     
     def daemonize(self):
         """데몬 프로세스로 실행"""
+        # fork 전에 쌓인 로그를 기록 (로그 스레드는 자식 프로세스로 복제되지 않음)
+        self.log_writer.flush()
+        
         try:
             # 첫 번째 fork
             pid = os.fork()
@@ -154,118 +496,611 @@ class OptimizedCursorAutomation:
         sys.stdout.flush()
         sys.stderr.flush()
         
-        # PID 파일 생성
-        self.write_pid_file()
-        
-        # 시그널 핸들러 등록
-        signal.signal(signal.SIGTERM, self.signal_handler)
-        signal.signal(signal.SIGINT, self.signal_handler)
+        # PID는 run_automation에서 잠금 파일을 잡을 때 기록됨
+        # 시그널 핸들러는 run_automation에서 등록됨
         
         self.log_message("데몬 모드로 시작됨")
     
     def check_and_terminate_existing_process(self):
-        """기존에 실행 중인 optimized_automation.py 프로세스가 있는지 확인하고 중단"""
+        """잠금 파일로 기존 인스턴스를 확인하고 중단 (전체 프로세스 목록을 훑지 않음)"""
         try:
-            current_pid = os.getpid()
-            terminated_count = 0
+            if not self.instance_lock.acquire(takeover=True, log=self.log_message):
+                self.log_message("❌ 기존 프로세스가 잠금을 놓지 않아 시작할 수 없습니다.")
+                return False
+            self.log_message(f"🔒 잠금 획득: {self.lock_file} (PID: {os.getpid()})")
+            self.log_message("✅ 작업을 시작합니다. 채팅창을 클릭해서 채팅창에 커서를 두세요")
+            return True
             
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        except Exception as e:
+            self.log_message(f"❌ 기존 프로세스 확인 중 오류: {e}")
+            return False
+        
+    def get_ui_driver(self):
+        """상주형 UI 드라이버를 반환 (최초 호출 시 프로세스 시작)"""
+        if self.ui_driver is None:
+            self.ui_driver = UIDriver(self.ui_driver_command, log=self.log_message)
+        self.ui_driver.start()
+        return self.ui_driver
+    
+    def close_ui_driver(self):
+        """UI 드라이버 프로세스 종료"""
+        if self.ui_driver is not None:
+            self.ui_driver.close()
+            self.ui_driver = None
+        
+    def wait_ready(self, stage, timeout):
+        """UI가 해당 단계에 도달할 때까지 대기 (timeout은 상한, 준비되면 즉시 반환)"""
+        self.readiness_probe.begin(stage)
+        started = time.monotonic()
+        ready = wait_until(lambda: self.readiness_probe.is_ready(stage), timeout,
+                           initial_interval=0.02 * self.poll_scale, max_interval=0.25 * self.poll_scale)
+        self.ready_elapsed = time.monotonic() - started
+        return ready
+        
+    def get_clipboard(self):
+        """붙여넣기 입력용 클립보드 (사용할 수 없으면 None, 경고는 한 번만)"""
+        if self.clipboard is None:
+            try:
+                self.clipboard = ClipboardStager()
+            except ClipboardUnavailable as e:
+                self.log_message(f"⚠️  클립보드를 사용할 수 없어 keystroke 입력으로 대체합니다: {e}")
+                self.clipboard = False
+        return self.clipboard or None
+    
+    def drive_ui_activation(self):
+        """UI 드라이버로 최초 한번 Cmd+L을 눌러 채팅창 활성화 (DriverBackend에서 호출)"""
+        driver = self.get_ui_driver()
+        driver.request('activate', app=self.target_app)
+        
+        # 활성화 완료 대기 후 Cmd+L
+        self.wait_ready(STAGE_ACTIVATED, 1.1)
+        driver.request('key', code=37, modifiers=['command down'])
+        self.wait_ready(STAGE_CHAT_FOCUSED, 0.3)
+    
+    def drive_ui_send(self, command, command_config=None, workspace_root=None):
+        """UI 드라이버로 채팅창에 프롬프트를 입력하고 전송 (DriverBackend에서 호출, 실패 시 예외)
+        
+        workspace_root: @파일 참조를 읽을 워크스페이스 루트 (기본: 기본 워크스페이스)
+        """
+        metrics = self.metrics
+        command_config = command_config or {}
+        # 전송할 프롬프트 준비 (옵션에 따라 @파일 내용을 포함한 여러 줄 텍스트)
+        prompt = build_prompt(command, workspace_root or self.workspace_root,
+                              command_config.get('inline_refs', self.inline_file_refs))
+        input_mode = command_config.get('input_mode', self.input_mode)
+        clipboard = self.get_clipboard() if input_mode == 'paste' or '\n' in prompt else None
+        if clipboard is None and '\n' in prompt:
+            # keystroke로 줄바꿈을 보내면 Enter로 처리되어 중간에 전송되므로 한 줄로 합침
+            prompt = ' '.join(line.strip() for line in prompt.splitlines() if line.strip())
+        
+        driver = self.get_ui_driver()
+        
+        # 딜레이 보정용: UI 상태를 확인할 수 있으면 각 딜레이가 상한인 대기의 실제 준비 시간,
+        # 확인할 수 없으면(고정 대기) 작업 완료 여부로 판단할 딜레이 키
+        latency = self.ui_latency = {}
+        outcome = self.ui_outcome = {}
+        observable = self.readiness_probe.observable
+        def observe(key, ready):
+            if observable:
+                latency.setdefault(key, []).append(self.ready_elapsed if ready else None)
+            else:
+                outcome[key] = None
+        
+        # Cursor IDE를 활성화하고 최전면이 될 때까지 대기
+        with metrics.phase('activate', command):
+            driver.request('activate', app=self.target_app)
+            observe('activation', self.wait_ready(STAGE_ACTIVATED, self.delays['activation'] + 1.0))
+        
+        # 채팅창 열기 (Cmd+L), 포커스가 잡히지 않으면 한 번 더 눌러 확실히 열기
+        with metrics.phase('focus', command):
+            driver.request('key', code=37, modifiers=['command down'])
+            if self.wait_ready(STAGE_CHAT_FOCUSED, 0.8):
+                observe('keystroke', True)  # 포커스까지 걸린 시간으로 다시 누른 뒤의 대기 상한을 학습
+            else:
+                driver.request('key', code=37, modifiers=['command down'])
+                focused = self.wait_ready(STAGE_CHAT_FOCUSED, self.delays['keystroke'])
+                observe('keystroke', focused)
+                if not focused:
+                    # 채팅창 텍스트 필드 찾기 및 클릭 (실패 시 일반적인 위치 클릭)
+                    driver.request('click_chat', app=self.target_app, x=500, y=600)
+                    self.wait_ready(STAGE_CHAT_FOCUSED, 0.3)
+        
+        # 명령어 입력: paste면 클립보드로 한 번에 붙여넣고 원래 클립보드 복원,
+        # keystroke면 글자 단위 입력 (텍스트는 파라미터로 전달되므로 이스케이프 불필요)
+        with metrics.phase('keystroke', command):
+            if clipboard:
+                previous = clipboard.stage(prompt)
                 try:
-                    # 프로세스 정보 가져오기
-                    proc_info = proc.info
-                    cmdline = proc_info.get('cmdline', [])
-                    
-                    # 현재 프로세스가 아니고, optimized_automation.py를 실행하는 프로세스인지 확인
-                    if (proc_info['pid'] != current_pid and 
-                        cmdline and 
-                        any(self.script_name in arg for arg in cmdline)):
-                        
-                        print(f"🔍 기존 프로세스 발견: PID {proc_info['pid']}")
-                        print(f"   명령어: {' '.join(cmdline)}")
-                        
-                        # 프로세스 중단
-                        proc.terminate()
-                        terminated_count += 1
-                        
-                        # 프로세스가 완전히 종료될 때까지 대기
-                        try:
-                            proc.wait(timeout=5)
-                            print(f"✅ 프로세스 {proc_info['pid']} 중단 완료")
-                        except psutil.TimeoutExpired:
-                            # 강제 종료
-                            proc.kill()
-                            print(f"⚠️  프로세스 {proc_info['pid']} 강제 종료")
-                            
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    # 프로세스가 이미 종료되었거나 접근 권한이 없는 경우
-                    continue
-            
-            if terminated_count > 0:
-                print(f"🛑 총 {terminated_count}개의 기존 프로세스를 중단했습니다.")
-                time.sleep(2)  # 프로세스 종료 대기
+                    driver.request('key', code=9, modifiers=['command down'])  # Cmd+V
+                    typed = self.wait_ready(STAGE_TYPED, self.delays['enter'])
+                finally:
+                    clipboard.restore(previous)
             else:
-                print("✅ 실행 중인 기존 프로세스가 없습니다. 작업을 시작합니다. 채팅창을 클릭해서 채팅창에 커서를 두세요")
-                
-            return True
-            
+                driver.request('keystroke', text=prompt)
+                typed = self.wait_ready(STAGE_TYPED, self.delays['enter'])
+            observe('enter', typed)
+            if not clipboard:
+                # @참조는 Cursor에서 멘션으로 바뀌어 길이가 달라지므로 일반 텍스트일 때만 글자 누락 확인
+                length = self.readiness_probe.value_length()
+                if typed and '@' not in prompt and length is not None and length != len(prompt):
+                    self.log_message(f"⚠️  입력 누락 감지: 입력창 {length}자 / 프롬프트 {len(prompt)}자")
+        
+        # 엔터 (입력창이 비워지지 않으면 한 번 더)
+        with metrics.phase('submit', command):
+            driver.request('key', code=36)
+            submitted = self.wait_ready(STAGE_SUBMITTED, self.delays['enter'])
+            observe('enter', submitted)
+            if not submitted:
+                driver.request('key', code=36)
+                observe('final', self.wait_ready(STAGE_SUBMITTED, self.delays['final']))
+    
+    def prepare_send(self, command, command_config, workspace_root):
+        """전송 전 단계: @파일 참조를 확인하고 입력 해시를 반환 (캐시를 쓰지 않는 명령이면 None)
+        
+        참조 파일이 없으면 MissingReferenceError, 입력이 마지막 성공 전송과 같으면 InputsUnchanged
+        @파일 참조가 없는 명령은 입력이 항상 같으므로 캐시를 쓰지 않는다
+        """
+        references = resolve_references(command, workspace_root)
+        if self.send_cache is None or not references or command_config.get('always_run', False):
+            return None
+        return self.send_cache.check(command, workspace_root)
+    
+    def prepare_command(self, command, command_config, workspace):
+        """전송 전 확인을 기록과 함께 실행 (UI 입력 잠금 밖에서 호출 가능, 공유 상태를 바꾸지 않음)
+        
+        (실패, 입력 해시)를 반환 - 참조 파일이 없으면 실패는 SendFailure, 입력이 같으면 InputsUnchanged
+        """
+        try:
+            return None, self.prepare_send(command, command_config, workspace.root)
+        except MissingReferenceError as e:
+            self.log_message(f"❌ {e}")
+            failure = classify_error(e)
+            self.trace.emit('send', cmd=command, ok=False, reason=failure.reason)
+            return failure, None
+        except InputsUnchanged:
+            self.trace.emit('send', cmd=command, ok=None, unchanged=True)
+            raise
+    
+    def send_command_to_cursor(self, command, command_config=None, workspace=None, prepared=None):
+        """UI 백엔드를 통해 Cursor IDE 채팅창에 AI 명령 전송 (전체 소요 시간 기록)
+        
+        입력이 마지막 성공 전송과 같으면 보내지 않고 InputsUnchanged를 호출한 쪽으로 전달
+        prepared: 미리 실행한 prepare_command 결과 (디스패처는 UI 입력 잠금 밖에서 확인함)
+        """
+        command_config = command_config or {}
+        workspace = workspace or self.workspace
+        self.last_failure = None
+        self.last_digest = None
+        failure, digest = prepared or self.prepare_command(command, command_config, workspace)
+        if failure:
+            self.last_failure = failure
+            return False
+        
+        self.ui_latency = {}
+        self.ui_outcome = {}
+        self.pending_calibration = []
+        try:
+            with self.metrics.phase('send', command):
+                success = self.backend.send(workspace, command, command_config)
         except Exception as e:
-            print(f"❌ 기존 프로세스 확인 중 오류: {e}")
+            self.last_failure = classify_error(e)
+            self.log_message(f"명령 전송 중 오류: {e} ({self.last_failure})")
+            self.trace.emit('send', cmd=command, ok=False, reason=self.last_failure.reason)
+            return False
+        
+        self.trace.emit('send', cmd=command, ok=bool(success))
+        if not success:
+            self.last_failure = SendFailure(RETRYABLE, "UI 백엔드가 전송 실패를 보고함")
+        else:
+            self.log_message(f"AI 명령 전송: {command}")
+            self.calibrate_latency(self.ui_latency)
+            self.pending_calibration = list(self.ui_outcome)
+            if digest:
+                self.last_digest = digest
+                try:
+                    self.send_cache.record(digest, command)
+                except OSError as e:
+                    self.log_message(f"⚠️  전송 캐시 기록 실패: {e}")
+        return success
+    
+    def get_watcher(self, root):
+        """워크스페이스 루트별 증분 스냅샷 (파일 해시를 재사용하도록 유지)"""
+        if root not in self.watchers:
+            self.watchers[root] = WorkspaceWatcher(root, self.config.get('send_cache_exclude', DEFAULT_EXCLUDE))
+        return self.watchers[root]
+    
+    def create_verifier(self, command_config, workspace):
+        """명령의 verify 설정으로 검증기를 만들고 전송 전 상태를 기록 (설정이 없거나 잘못되면 None)"""
+        try:
+            verifier = create_verifier(command_config, self.get_watcher(workspace.root))
+        except ValueError as e:
+            self.log_message(f"❌ 결과 검증 설정 오류 (검증하지 않음): {e}")
+            return None
+        if verifier:
+            verifier.arm()
+        return verifier
+    
+    def verify_send(self, verifier, command, waited, digest=None):
+        """전송 결과 검증 (완료 감지로 기다리지 않았으면 조건이 맞을 때까지 verifier.timeout만큼 대기)
+        
+        digest: 검증에 실패하면 전송 캐시에서 취소할 입력 해시
+        중단되면 None
+        """
+        started = time.monotonic()
+        results = []
+        def passed():
+            results.append(verifier.check())
+            return not self.running or results[-1].passed
+        if waited:
+            passed()
+        else:
+            wait_until(passed, verifier.timeout,
+                       initial_interval=0.1 * self.poll_scale, max_interval=1.0 * self.poll_scale)
+        if not self.running:
+            return None
+        result = results[-1]
+        self.metrics.observe('verify', command, time.monotonic() - started)
+        self.trace.emit('verify', cmd=command, passed=result.passed, detail=result.describe(), on_fail=verifier.on_fail)
+        self.verification['passed' if result.passed else 'failed'] += 1
+        self.verification['last'] = {'command': command, 'passed': result.passed, 'detail': result.describe(),
+                                     'at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        if result.passed:
+            self.log_message(f"🔎 결과 검증 통과: {verifier.description} - {result.describe()}")
+        else:
+            self.log_message(f"❌ 결과 검증 실패: {result.describe()}")
+            if self.send_cache is not None and digest:
+                self.send_cache.discard(digest)  # 같은 입력으로 다시 보낼 수 있도록
+        return result
+    
+    def retry_policy_for(self, command_config):
+        """명령별 retry 설정이 있으면 전역 설정 위에 덮어쓴 재시도 정책"""
+        if not command_config.get('retry'):
+            return self.retry_policy
+        return RetryPolicy.from_config(dict(self.retry_config, **command_config['retry']),
+                                       self.error_retry_delay, self.retry_policy.random)
+    
+    def record_send_success(self):
+        if self.breaker.record_success():
+            self.log_message("✅ 전송 복구 확인 - 회로 차단기를 닫고 정상 실행을 재개합니다")
+            self.trace.emit('breaker', state=self.breaker.state)
+    
+    def record_send_failure(self, failure):
+        """회로 차단기에 실패 기록 (이번 실패로 열렸으면 전송을 멈추고 상태 확인을 예약)"""
+        if self.breaker.record_failure():
+            self.log_message(f"🔌 연속 {self.breaker.failures}회 실패 ({failure.reason}) - 회로 차단기 열림, "
+                             f"전송을 멈추고 {self.breaker.cooldown:.0f}초 후 상태를 확인합니다")
+            self.trace.emit('breaker', state=self.breaker.state, cooldown=self.breaker.cooldown)
+            self.scheduler.schedule(self.breaker_job, self.breaker.retry_at)
+    
+    def handle_send_failure(self, entry, job, failure, breaker=True):
+        """실패한 전송을 재시도/건너뛰기/일시정지 중 하나로 처리 (다음 실행을 직접 예약했으면 True)
+        
+        breaker: 회로 차단기에 실패로 기록할지 (결과 검증 실패는 IDE 문제가 아니므로 기록하지 않음)
+        """
+        entry.failures += 1
+        if breaker:
+            self.record_send_failure(failure)
+        policy = self.retry_policy_for(entry.config)
+        if policy.should_retry(failure, entry.failures):
+            # 전송되지 않았으므로 횟수(max_count)에서 빼지 않고, 백오프 뒤 같은 회차를 다시 시도
+            entry.sent -= 1
+            self.count = entry.sent
+            delay = policy.delay(entry.failures)
+            self.log_message(f"🔁 {delay:.1f}초 후 재시도 ({entry.failures}/{policy.max_attempts - 1}): {failure.reason}")
+            self.trace.emit('retry', cmd=entry.command, attempt=entry.failures, delay=round(delay, 6), reason=failure.reason)
+            self.scheduler.schedule(job, time.monotonic() + delay)
+            return True
+        
+        entry.failures = 0
+        if failure.retryable:
+            self.log_message(f"   재시도 {policy.max_attempts - 1}회 모두 실패 - 이번 회차는 실패로 처리합니다")
+            return False
+        if failure.scope == SCOPE_COMMAND:
+            self.skip_entry(entry)
+            self.log_message(f"⛔ 재시도해도 해결되지 않는 오류라 명령을 건너뜁니다: {failure.reason}")
             return False
         
-    def send_command_to_cursor(self, command):
-        """최적화된 방식으로 Cursor IDE 채팅창에 AI 명령 전송"""
+        # 권한 문제 등 사람이 환경을 고쳐야 하는 오류: 횟수는 돌려주고 resume 요청까지 일시정지
+        entry.sent -= 1
+        self.count = entry.sent
+        self.paused = True
+        self.log_message(f"⛔ 재시도해도 해결되지 않는 오류 - 큐를 일시정지합니다: {failure.reason}")
+        self.log_message("   원인을 해결한 뒤 'python3 automation_ctl.py resume'으로 재개하세요")
+        self.scheduler.schedule(job, time.monotonic())
+        return True
+    
+    def check_recovery(self, job):
+        """회로가 열리고 cooldown이 지나면 입력 없이 상태만 확인해서 시험 전송 여부를 결정"""
+        self.scheduler.unschedule(job)
+        healthy, detail = self.backend.health_check()
+        if healthy:
+            self.breaker.half_open()
+            self.log_message(f"🩺 상태 확인 성공 ({detail}) - 다음 전송으로 복구 여부를 확인합니다")
+        else:
+            self.breaker.reopen()
+            self.log_message(f"🩺 상태 확인 실패 ({detail}) - {self.breaker.cooldown:.0f}초 후 다시 확인합니다")
+            self.scheduler.schedule(job, self.breaker.retry_at)
+        self.trace.emit('breaker', state=self.breaker.state, cooldown=self.breaker.cooldown, detail=detail)
+    
+    def calibrate_latency(self, measured):
+        """보정 모드에서 측정한 준비 시간으로 대기 상한을 조정 (UI 상태를 확인할 수 있는 경우)"""
+        if not (self.calibrating and self.calibrator and measured):
+            return
+        try:
+            changes = self.calibrator.observe_latency(self.configured_delays, measured)
+        except OSError as e:
+            self.log_message(f"⚠️  딜레이 프로필 저장 실패: {e}")
+            return
+        self.delays = self.calibrator.effective(self.configured_delays)
+        for key, (before, after) in changes.items():
+            if after > before:
+                self.log_message(f"📐 딜레이 보정: {key} 상한 {before}초 → {after}초 (준비 시간 초과, 늘림)")
+    
+    def calibrate_delays(self, outcome):
+        """보정 모드에서 고정 대기 딜레이를 전송 결과로 조정 (AIMD)"""
+        if not (self.calibrating and self.calibrator and outcome):
+            return
+        try:
+            changes = self.calibrator.observe(self.configured_delays, outcome)
+        except OSError as e:
+            self.log_message(f"⚠️  딜레이 프로필 저장 실패: {e}")
+            return
+        self.delays = self.calibrator.effective(self.configured_delays)
+        for key, (before, after) in changes.items():
+            if after > before:
+                self.log_message(f"📐 딜레이 보정: {key} {before}초 → {after}초 (실패 감지, 늘림)")
+    
+    def flush_calibration(self):
+        """아직 저장하지 않은 학습 딜레이를 프로필에 저장 (종료 시)"""
+        if not (self.calibrating and self.calibrator):
+            return
+        try:
+            self.calibrator.flush()
+        except OSError as e:
+            self.log_message(f"⚠️  딜레이 프로필 저장 실패: {e}")
+    
+    def wait_for_completion(self, probe, timeout, command):
+        """AI 작업 완료를 감지할 때까지 대기 (timeout 초과 시 False)"""
+        started = time.monotonic()
+        skipped = lambda: self.current_entry is not None and self.current_entry.skipped
+        completed = wait_until(lambda: not self.running or skipped() or probe.is_complete(), timeout,
+                               initial_interval=0.01 * self.poll_scale, max_interval=1.0 * self.poll_scale)
+        elapsed = time.monotonic() - started
+        self.metrics.observe('wait_completion', command, elapsed)
+        self.trace.emit('complete', cmd=command, ok=completed, dur=round(elapsed, 6))
+        if completed and self.running and not skipped():
+            self.log_message(f"✅ 작업 완료 감지: {probe.description} ({elapsed:.1f}초)")
+        elif not completed:
+            self.log_message(f"⏱️  작업 완료 감지 시간 초과 ({timeout}초) - 다음으로 진행")
+        return completed
+    
+    def run_workspaces(self):
+        """여러 워크스페이스(창)의 명령 목록을 병렬로 실행"""
+        workspaces = [Workspace.from_config(entry, self.config_dir) for entry in self.config['workspaces']]
+        backend = self.backend
+        self.log_message(f"🪟 워크스페이스 {len(workspaces)}개 병렬 실행: {', '.join(w.name for w in workspaces)}")
+        
+        dispatcher = MultiWorkspaceDispatcher(
+            workspaces, backend, self.log_message, lambda: self.running, self.completion_timeout,
+            send=lambda workspace, command, config, prepared: self.send_command_to_cursor(
+                command, config, workspace, prepared),
+            prepare=lambda workspace, command, config: self.prepare_command(command, config, workspace),
+            create_verifier=lambda workspace, config: self.create_verifier(config, workspace),
+            verify=lambda verifier, command, waited, prepared: self.verify_send(
+                verifier, command, waited, digest=prepared[1] if prepared else None),
+            retry_policy=self.retry_policy_for,
+            sleep=self.scheduler.sleep)
+        started = time.monotonic()
+        dispatcher.run()
+        
+        elapsed = time.monotonic() - started
+        total_sent = sum(w.sent for w in workspaces)
+        self.log_message(f"📊 총 {total_sent}회 전송, {elapsed:.1f}초 소요")
+        if isinstance(backend, SimulatedBackend):
+            self.log_message(f"   가상 백엔드 포커스 충돌: {backend.focus_conflicts}회")
+    
+    def run_queue_step(self, job):
+        """실행 큐에서 다음 명령을 한 번 전송하고 다음 실행 시각을 예약"""
+        previous = self.current_entry
+        entry = self.queue.next_pending()
+        if previous is not None and previous.removed:
+            self.log_message(f"🗑️  설정에서 삭제된 명령 중단: {previous.command}")
+        
+        if entry is None:
+            # 큐를 모두 실행함 (제어 소켓으로 명령이 추가되면 다시 예약됨)
+            self.scheduler.unschedule(job)
+            self.current_entry = None
+            self.log_message("🎉 모든 명령 실행 완료!")
+            if self.journal:
+                self.journal.complete()
+            if self.periodic_jobs:
+                self.log_message(f"⏰ 주기 명령 {len(self.periodic_jobs)}개 대기 중")
+            return
+        
+        command_index = self.queue.index_of(entry)
+        if entry is not previous:
+            self.current_entry = entry
+            self.current_command_index = command_index
+            self.current_command = entry.config
+            self.log_message(f"🚀 명령 {command_index + 1}/{self.total_commands} 시작: {entry.command}")
+            self.log_message(f"   간격: {entry.interval}초, 최대 횟수: {entry.max_count}회")
+        
+        # 설정 변경으로 항목 내용이 바뀌었을 수 있으므로 매번 다시 읽음
+        self.interval = entry.interval
+        self.max_count = entry.max_count
+        self.command = entry.command
+        completed = False
+        success = False
+        counted = acked = False
+        
         try:
-            # Cursor IDE를 활성화하고 채팅창에 포커스를 맞춘 후 입력
-            applescript = f'''
-            tell application "Cursor"
-                activate
-                delay {self.delays['activation']}
-            end tell
+            # 완료 감지기가 있으면 interval 대신 완료 시점에 바로 다음 명령 전송
+            probe = self.backend.completion_probe(self.workspace, entry.config)
+            timeout = entry.config.get('timeout', self.completion_timeout)
+            verifier = self.create_verifier(entry.config, self.workspace)
             
-            tell application "System Events"
-                tell process "Cursor"
-                    -- Cursor가 완전히 활성화될 때까지 대기
-                    delay 1.0
-                    
-                    -- 채팅창이 보이도록 보장 (Cmd+L 두 번으로 확실히 열기)
-                    key code 37 using command down
-                    delay 0.8
-                    key code 37 using command down
-                    delay {self.delays['keystroke']}
-                    
-                    -- 채팅창 텍스트 필드 찾기 및 클릭
-                    try
-                        set chatField to first text field of first window whose description contains "chat" or description contains "message" or description contains "input" or description contains "Ask"
-                        click chatField
-                        delay 0.3
-                    on error
-                        -- 대안: 채팅창 영역 클릭 (일반적인 위치)
-                        click at {{500, 600}}
-                        delay 0.3
-                    end try
-                    
-                    -- 명령어 입력
-                    keystroke "{command}"
-                    delay {self.delays['enter']}
-                    
-                    -- 엔터 두 번
-                    key code 36
-                    delay {self.delays['enter']}
-                    key code 36
-                    delay {self.delays['final']}
-                end tell
-            end tell
-            '''
+            entry.sent += 1
+            self.count = entry.sent
+            counted = True
+            self.trace.emit('step', cmd=entry.command, key=entry.key, n=entry.sent, interval=entry.interval,
+                            max_count=entry.max_count, mode=entry.config.get('schedule_mode', self.schedule_mode),
+                            completion=probe is not None, timeout=timeout)
             
-            # AppleScript 실행
-            subprocess.run(['osascript', '-e', applescript], check=True)
-            
-            self.log_message(f"AI 명령 전송: {command}")
-            return True
+            # 명령 전송
+            if probe:
+                probe.arm()
+            if self.journal:
+                self.journal.dispatch(entry.key, entry.sent)
+            unchanged = False
+            try:
+                success = self.send_command_to_cursor(self.command, entry.config)
+            except InputsUnchanged as e:
+                unchanged = True
+                if not entry.unchanged:
+                    sent_at = datetime.fromtimestamp(e.sent_at).strftime('%Y-%m-%d %H:%M:%S') if e.sent_at else '알 수 없음'
+                    self.log_message(f"⏭️  명령 {command_index + 1} - {self.count}번째 전송 생략: "
+                                     f"마지막 성공 전송({sent_at}) 이후 입력 변경 없음, 입력이 바뀔 때까지 대기")
+            entry.unchanged = entry.unchanged + 1 if unchanged else 0
+            if self.journal:
+                if unchanged:
+                    self.journal.cancel(entry.key, entry.sent)
+                else:
+                    self.journal.ack(entry.key, entry.sent, success)
+            acked = True
+            if unchanged:
+                # 보내지 않은 회차는 횟수(max_count)에서 빼지 않고 다음 예정 시각에 입력을 다시 확인
+                entry.sent -= 1
+                self.count = entry.sent
+            if success:
+                self.log_message(f"✅ 명령 {command_index + 1} - {self.count}번째 전송 성공")
+                # 회로 차단기는 IDE로의 전송만 판단 (AI 작업 결과 검증과 무관)
+                self.record_send_success()
+                if probe:
+                    self.log_message(f"   완료 감지: {probe.description}, 최대 {timeout}초 대기")
+                    completed = self.wait_for_completion(probe, timeout, self.command)
+                    # UI 상태로 확인할 수 없던 딜레이는 AI 작업이 실제로 시작/완료되었는지로 판단
+                    if self.running and not entry.skipped:
+                        self.calibrate_delays({key: completed for key in self.pending_calibration})
+                result = None
+                if verifier and self.running and not entry.skipped:
+                    result = self.verify_send(verifier, self.command, waited=probe is not None, digest=self.last_digest)
+                if result is not None and not result.passed:
+                    # 프롬프트가 반영되지 않음: 실패로 기록하고 진행하거나, on_fail이 retry면 같은 회차를 다시 보냄
+                    completed = False
+                    if verifier.on_fail == ON_FAIL_RETRY:
+                        failure = SendFailure(RETRYABLE, f"결과 검증 실패 ({result.describe()})", SCOPE_COMMAND)
+                        if self.handle_send_failure(entry, job, failure, breaker=False):
+                            self.export_metrics()
+                            return
+                entry.failures = 0
+            elif not unchanged:
+                self.log_message(f"❌ 명령 {command_index + 1} - {self.count}번째 전송 실패")
+                if self.handle_send_failure(entry, job, self.last_failure):
+                    self.export_metrics()
+                    return
+            self.export_metrics()
             
         except Exception as e:
-            self.log_message(f"명령 전송 중 오류: {e}")
-            return False
+            # 전송 실패와 같은 경로로 처리 (횟수를 돌려주고 max_attempts를 넘으면 실패/건너뛰기/일시정지)
+            self.log_message(f"오류 발생: {e}")
+            if not counted:
+                # 회차를 세기 전의 오류: handle_send_failure가 되돌릴 수 있도록 이번 회차로 셈
+                entry.sent += 1
+                self.count = entry.sent
+            elif self.journal and not acked:
+                self.journal.ack(entry.key, entry.sent, False)
+            completed = False
+            if self.handle_send_failure(entry, job, classify_error(e)):
+                self.export_metrics()
+                return
+            self.export_metrics()
+        
+        finished = time.monotonic()
+        if entry.done:
+            self.log_message(f"🎉 명령 {command_index + 1} 완료! 총 {self.count}회 실행됨")
+            # 명령 간 대기 (남은 명령이 있고, 완료를 감지하지 못한 경우)
+            delay = 0
+            if not completed and self.queue.has_pending_after(entry):
+                delay = self.command_interval_delay
+                self.log_message(f"⏳ 다음 명령까지 {delay}초 대기...")
+            self.scheduler.schedule(job, finished + delay)
+        elif completed:
+            # 완료를 감지한 경우 바로 다음 반복
+            self.scheduler.schedule(job, finished)
+        else:
+            mode = entry.config.get('schedule_mode', self.schedule_mode)
+            self.log_message(f"다음 실행까지 {self.interval}초 대기...")
+            self.scheduler.schedule(job, next_deadline(mode, job.deadline, finished, self.interval))
+    
+    def schedule_periodic(self):
+        """config.json의 periodic_commands를 벽시계 기준 주기 작업으로 등록 (설정 변경 시 다시 등록)"""
+        previous = {job.name: job for job in self.periodic_jobs}
+        for job in self.periodic_jobs:
+            self.scheduler.unschedule(job)
+        self.periodic_jobs = []
+        
+        periodic = self.config.get('periodic_commands', [])
+        for key, entry in zip(command_keys(periodic), periodic):
+            try:
+                cron = CronSpec.from_config(entry)
+            except (KeyError, ValueError) as e:
+                self.log_message(f"❌ 주기 명령 설정 오류 ({entry.get('command')}): {e}")
+                continue
+            job = Job(key, (entry, cron))
+            if key in previous:
+                job.count = previous[key].count
+            if entry.get('max_count') is not None and job.count >= entry['max_count']:
+                continue
+            fire = cron.next_fire(datetime.now())
+            if fire is None:
+                continue
+            self.scheduler.schedule_wall(job, fire.timestamp())
+            self.periodic_jobs.append(job)
+            if key not in previous:
+                self.log_message(f"⏰ 주기 명령 등록: {entry.get('command')} - {cron.describe()}, "
+                                 f"다음 실행 {fire.strftime('%Y-%m-%d %H:%M')}")
+    
+    def run_periodic(self, job):
+        """주기 명령을 한 번 전송하고 다음 실행 시각(벽시계 기준 격자)을 예약"""
+        entry, cron = job.payload
+        command = entry.get('command', '')
+        scheduled = datetime.fromtimestamp(job.wall_time).strftime('%H:%M') if job.wall_time else '-'
+        self.log_message(f"⏰ 주기 명령 실행: {command} (예정 {scheduled})")
+        job.count += 1
+        try:
+            probe = self.backend.completion_probe(self.workspace, entry)
+            verifier = self.create_verifier(entry, self.workspace)
+            if probe:
+                probe.arm()
+            if self.send_command_to_cursor(command, entry):
+                self.record_send_success()
+                self.log_message(f"✅ 주기 명령 {job.count}번째 전송 성공: {command}")
+                if probe:
+                    completed = self.wait_for_completion(probe, entry.get('timeout', self.completion_timeout), command)
+                    if self.running:
+                        self.calibrate_delays({key: completed for key in self.pending_calibration})
+                if verifier and self.running:
+                    self.verify_send(verifier, command, waited=probe is not None, digest=self.last_digest)  # 주기 명령은 결과만 기록
+            else:
+                self.log_message(f"❌ 주기 명령 {job.count}번째 전송 실패: {command}")
+                self.record_send_failure(self.last_failure)
+        except InputsUnchanged:
+            job.count -= 1  # 보내지 않았으므로 max_count에서 빼지 않음
+            self.log_message(f"⏭️  주기 명령 전송 생략: 입력 변경 없음 ({command})")
+        self.export_metrics()
+        
+        fire = cron.next_fire(datetime.now())
+        if fire is None or (entry.get('max_count') is not None and job.count >= entry['max_count']):
+            self.scheduler.unschedule(job)
+            self.periodic_jobs.remove(job)
+            return
+        self.scheduler.schedule_wall(job, fire.timestamp())
+    
+    def install_signal_handlers(self):
+        """SIGTERM/SIGINT를 받으면 대기를 취소하고 정리 후 종료 (메인 스레드에서만 가능)"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.signal_handler)
+            signal.signal(signal.SIGINT, self.signal_handler)
     
     def run_automation(self):
         """자동화 실행"""
@@ -279,100 +1114,84 @@ class OptimizedCursorAutomation:
         
         # 각 명령별 정보 출력
         for i, cmd in enumerate(self.commands):
-            self.log_message(f"명령 {i+1}: {cmd['command']} (간격: {cmd['interval']}초, 횟수: {cmd['max_count']}회)")
+            self.log_message(f"명령 {i+1}: {describe(cmd)}")
         self.log_message("=" * 50)
         
         # 기존 프로세스 확인 및 중단
         self.log_message("🔍 기존 프로세스 확인 중...")
-        self.check_and_terminate_existing_process()
+        if not self.check_and_terminate_existing_process():
+            return
+        self.install_signal_handlers()
+        self.open_trace()
+        self.start_control_server()
         
+        try:
+            self.run_scheduler()
+        finally:
+            # 정리 작업 (시그널로 중단된 경우에도 여기서 한 번만 수행)
+            self.backend.close()
+            self.flush_calibration()
+            self.trace.close()
+            self.close_journal()
+            self.close_control_server()
+            self.release_instance_lock()
+    
+    def run_scheduler(self):
+        """타이머 힙에서 예정 시각이 가장 이른 작업(실행 큐 / 주기 명령)을 골라 실행"""
         # Cursor IDE 활성화 안내
         self.log_message("⚠️  주의사항:")
         self.log_message("1. Cursor IDE를 열고 채팅창이 보이는 상태로 두세요")
         self.log_message("2. 채팅창을 클릭하여 커서를 두세요")
-        self.log_message("3. 1초 후 자동화가 시작됩니다...")
+        self.log_message(f"3. {self.startup_delay}초 후 자동화가 시작됩니다...")
         self.log_message("4. 자동화 중에는 Cursor IDE 창을 건드리지 마세요")
         if not self.daemon_mode:
             self.log_message("5. 중단하려면 Ctrl+C를 누르세요")
         
-        time.sleep(1)
+        if not self.scheduler.sleep(self.startup_delay):
+            return
+        
+        # 워크스페이스가 여러 개 설정된 경우 병렬 디스패처로 실행
+        if self.config.get('workspaces'):
+            self.run_workspaces()
+            return
         
         # 최초 한번만 Cmd+L 실행하여 채팅창 활성화
         self.log_message("🔧 최초 채팅창 활성화 중...")
         try:
-            initial_activation_script = '''
-            tell application "Cursor"
-                activate
-                delay 0.3
-            end tell
-            
-            tell application "System Events"
-                tell process "Cursor"
-                    delay 0.8
-                    key code 37 using command down
-                    delay 0.3
-                end tell
-            end tell
-            '''
-            subprocess.run(['osascript', '-e', initial_activation_script], check=True)
+            self.backend.activate_chat()
             self.log_message("✅ 최초 채팅창 활성화 완료")
         except Exception as e:
             self.log_message(f"⚠️  최초 채팅창 활성화 실패: {e}")
         
-        # 모든 명령을 순차적으로 실행
-        for command_index, command_config in enumerate(self.commands):
+        # 이전 실행의 진행 상태 복원
+        self.open_journal()
+        
+        self.scheduler.schedule(self.queue_job, time.monotonic())
+        self.schedule_periodic()
+        
+        while self.running:
+            job = self.scheduler.next_job()
+            if job is None:
+                break  # 실행 큐가 끝났고 남은 주기 명령도 없음
+            if not self.wait_for_job(job):
+                continue  # 제어 요청이나 설정 변경으로 깨어남: 다음 작업을 다시 고름
+            self.wait_while_paused()
             if not self.running:
                 break
-                
-            self.current_command_index = command_index
-            self.current_command = command_config
-            self.interval = command_config.get('interval', 10)
-            self.max_count = command_config.get('max_count', 10)
-            self.command = command_config.get('command', '@2.test.md')
-            self.count = 0  # 각 명령마다 카운터 리셋
-            
-            self.log_message(f"🚀 명령 {command_index + 1}/{self.total_commands} 시작: {self.command}")
-            self.log_message(f"   간격: {self.interval}초, 최대 횟수: {self.max_count}회")
-            
-            # 현재 명령 실행
-            while self.count < self.max_count and self.running:
-                try:
-                    self.count += 1
-                    
-                    # 명령 전송
-                    success = self.send_command_to_cursor(self.command)
-                    if success:
-                        self.log_message(f"✅ 명령 {command_index + 1} - {self.count}번째 전송 성공")
-                    else:
-                        self.log_message(f"❌ 명령 {command_index + 1} - {self.count}번째 전송 실패")
-                    
-                    # 최대 실행 횟수 도달 시 다음 명령으로
-                    if self.count >= self.max_count:
-                        self.log_message(f"🎉 명령 {command_index + 1} 완료! 총 {self.count}회 실행됨")
-                        break
-                    
-                    # 다음 반복까지 대기 (첫 번째 실행 후부터 interval 적용)
-                    self.log_message(f"다음 실행까지 {self.interval}초 대기...")
-                    time.sleep(self.interval)
-                    
-                except KeyboardInterrupt:
-                    self.log_message("⏹️  사용자에 의해 중단됨")
-                    self.running = False
-                    break
-                except Exception as e:
-                    self.log_message(f"오류 발생: {e}")
-                    time.sleep(5)  # 오류 시 5초 대기 후 재시도
-            
-            # 명령 간 대기 (마지막 명령이 아닌 경우)
-            if command_index < self.total_commands - 1 and self.running:
-                self.log_message(f"⏳ 다음 명령까지 {self.command_interval_delay}초 대기...")
-                time.sleep(self.command_interval_delay)
-        
-        if self.running:
-            self.log_message("🎉 모든 명령 실행 완료!")
+            if job.deadline is not None:
+                self.trace.emit('run', job=job.name, late=round(time.monotonic() - job.deadline, 6))
+            if job is self.breaker_job:
+                self.check_recovery(job)
+            elif self.breaker.is_open:
+                # 회로가 열린 동안은 전송하지 않고 상태 확인 이후로 미룸
+                self.scheduler.schedule(job, self.breaker.retry_at)
+            elif job is self.queue_job:
+                self.run_queue_step(job)
+            else:
+                self.run_periodic(job)
         
-        # 정리 작업
-        self.remove_pid_file()
+        if not self.running:
+            self.log_message("⏹️  중단 요청으로 종료합니다")
 
 def main():
     """메인 함수"""
@@ -383,6 +1202,10 @@ def main():
                        help='실행 중인 자동화 프로세스 중단')
     parser.add_argument('--status', action='store_true', 
                        help='실행 상태 확인')
+    parser.add_argument('--fresh', action='store_true', 
+                       help='이전 진행 기록을 무시하고 처음부터 실행')
+    parser.add_argument('--calibrate', action='store_true',
+                       help='전송 결과를 보고 딜레이를 자동 보정해서 프로필에 저장')
     
     args = parser.parse_args()
     
@@ -396,85 +1219,93 @@ def main():
     
     if args.daemon:
         print("백그라운드 데몬 모드로 시작합니다...")
-        automation = OptimizedCursorAutomation(daemon_mode=True)
+        automation = OptimizedCursorAutomation(daemon_mode=True, resume=not args.fresh, calibrate=args.calibrate)
         automation.daemonize()
     else:
-        automation = OptimizedCursorAutomation(daemon_mode=False)
+        automation = OptimizedCursorAutomation(daemon_mode=False, resume=not args.fresh, calibrate=args.calibrate)
         print("최적화된 Cursor IDE AI 자동화 도구")
         print(f"총 {automation.total_commands}개의 명령을 순차적으로 실행합니다.")
         for i, cmd in enumerate(automation.commands):
-            print(f"명령 {i+1}: {cmd['command']} (간격: {cmd['interval']}초, 횟수: {cmd['max_count']}회)")
+            print(f"명령 {i+1}: {describe(cmd)}")
         print()
     
     automation.run_automation()
 
+def configured_lock_file(config_file="config.json"):
+    """config.json의 lock_file 경로 (없거나 읽을 수 없으면 기본 경로)"""
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return LOCK_FILE
+    return config.get('lock_file', LOCK_FILE) if isinstance(config, dict) else LOCK_FILE
+
 def stop_automation():
     """실행 중인 자동화 프로세스 중단"""
-    pid_file = "/tmp/optimized_automation.pid"
-    
-    if not os.path.exists(pid_file):
+    lock_file = configured_lock_file()
+    info = probe_lock(lock_file)
+    if info is None:
         print("❌ 실행 중인 자동화 프로세스가 없습니다.")
         return
     
     try:
-        with open(pid_file, 'r') as f:
-            pid = int(f.read().strip())
-        
-        # 프로세스 존재 확인
-        if psutil.pid_exists(pid):
-            process = psutil.Process(pid)
-            if "optimized_automation.py" in ' '.join(process.cmdline()):
-                process.terminate()
-                print(f"✅ 프로세스 {pid} 중단 요청됨")
-                
-                # 프로세스 종료 대기
-                try:
-                    process.wait(timeout=5)
-                    print("✅ 프로세스가 정상적으로 종료되었습니다.")
-                except psutil.TimeoutExpired:
-                    process.kill()
-                    print("⚠️  프로세스를 강제 종료했습니다.")
-            else:
-                print("❌ 해당 PID는 자동화 프로세스가 아닙니다.")
+        pid = info.get('pid')
+        if not signal_holder(info, signal.SIGTERM):
+            print(f"❌ 프로세스 {pid}에 중단 신호를 보낼 수 없습니다.")
+            return
+        print(f"✅ 프로세스 {pid} 중단 요청됨")
+        
+        # 프로세스가 잠금을 놓을 때까지 대기 (종료되면 바로 반환)
+        if wait_until(lambda: probe_lock(lock_file) is None, 5, max_interval=0.1):
+            print("✅ 프로세스가 정상적으로 종료되었습니다.")
         else:
-            print("❌ 프로세스가 이미 종료되었습니다.")
-            os.remove(pid_file)
+            signal_holder(info, signal.SIGKILL)
+            print("⚠️  프로세스를 강제 종료했습니다.")
             
     except Exception as e:
         print(f"❌ 중단 중 오류 발생: {e}")
 
+def print_latency_summary():
+    """제어 소켓으로 단계별 소요 시간 p50/p95/p99를 조회해서 출력"""
+    socket_path = configured_socket_path()
+    if socket_path is None:
+        return
+    try:
+        latency = send_request('status', socket_path).get('latency') or {}
+    except (OSError, ValueError):
+        return
+    if not latency:
+        return
+    print("\n📈 단계별 소요 시간 (p50 / p95 / p99, 초):")
+    for command, phases in latency.items():
+        print(f"   {command}")
+        for phase, stats in phases.items():
+            print(f"     {phase:<16} {stats['p50']} / {stats['p95']} / {stats['p99']} (n={stats['count']})")
+
 def check_status():
     """실행 상태 확인"""
-    pid_file = "/tmp/optimized_automation.pid"
     log_file = "/tmp/optimized_automation.log"
     
-    if not os.path.exists(pid_file):
+    info = probe_lock(configured_lock_file())
+    if info is None:
         print("❌ 자동화 프로세스가 실행 중이지 않습니다.")
         return
     
     try:
-        with open(pid_file, 'r') as f:
-            pid = int(f.read().strip())
-        
-        if psutil.pid_exists(pid):
-            process = psutil.Process(pid)
-            if "optimized_automation.py" in ' '.join(process.cmdline()):
-                print(f"✅ 자동화 프로세스가 실행 중입니다. (PID: {pid})")
-                print(f"   시작 시간: {datetime.fromtimestamp(process.create_time()).strftime('%Y-%m-%d %H:%M:%S')}")
-                print(f"   CPU 사용률: {process.cpu_percent()}%")
-                print(f"   메모리 사용량: {process.memory_info().rss / 1024 / 1024:.1f} MB")
-                
-                if os.path.exists(log_file):
-                    print(f"\n📋 최근 로그 (마지막 5줄):")
-                    with open(log_file, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        for line in lines[-5:]:
-                            print(f"   {line.strip()}")
-            else:
-                print("❌ 해당 PID는 자동화 프로세스가 아닙니다.")
-        else:
-            print("❌ 프로세스가 종료되었습니다. PID 파일을 정리합니다.")
-            os.remove(pid_file)
+        import psutil
+        
+        pid = info.get('pid')
+        process = psutil.Process(pid)
+        print(f"✅ 자동화 프로세스가 실행 중입니다. (PID: {pid})")
+        print(f"   시작 시간: {datetime.fromtimestamp(info.get('start_time') or process.create_time()).strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"   CPU 사용률: {process.cpu_percent(interval=0.2)}%")  # 첫 호출은 항상 0.0이므로 짧게 측정
+        print(f"   메모리 사용량: {process.memory_info().rss / 1024 / 1024:.1f} MB")
+        print_latency_summary()
+        
+        if os.path.exists(log_file):
+            print(f"\n📋 최근 로그 (마지막 5줄):")
+            for line in tail_lines(log_file, 5):
+                print(f"   {line.strip()}")
             
     except Exception as e:
         print(f"❌ 상태 확인 중 오류 발생: {e}")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+진행 상태 저널
+명령 전송(dispatch)과 결과(ack)를 추가 전용 파일에 기록해두고,
+재시작 시 다시 읽어서 중단된 위치부터 이어서 실행할 수 있게 한다
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class ProgressJournal:
+    def __init__(self, path, fsync_batch=8, compact_threshold=1000):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.compact_threshold = compact_threshold
+        self.state = {}  # key -> {'dispatched': n, 'acked': n} (+ 'skipped', 실행 중 추가된 항목은 'config')
+        self.lock = threading.RLock()  # 제어 소켓 스레드에서도 기록함
+        self.file = None
+        self.unsynced = 0
+        self.records = 0
+
+    def replay(self):
+        """저널을 읽어 명령별 진행 상태를 복원 (깨진 마지막 줄은 무시)"""
+        self.state = {}
+        self.records = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # 기록 도중 중단된 줄
+                    self._apply(record)
+                    self.records += 1
+        return self.state
+
+    def _apply(self, record):
+        kind = record.get('t')
+        if kind == 'snapshot':
+            self.state = record.get('state', {})
+        elif kind == 'complete':
+            self.state = {}
+        elif kind in ('dispatch', 'ack'):
+            progress = self.state.setdefault(record['key'], {'dispatched': 0, 'acked': 0})
+            field = 'dispatched' if kind == 'dispatch' else 'acked'
+            progress[field] = max(progress[field], record['n'])
+        elif kind == 'cancel' and record['key'] in self.state:
+            # 전송하지 않은 회차: 선기록한 dispatch를 되돌림
+            progress = self.state[record['key']]
+            progress['dispatched'] = min(progress['dispatched'], record['n'] - 1)
+            progress['acked'] = min(progress['acked'], record['n'] - 1)
+        elif kind == 'skip':
+            self.state.setdefault(record['key'], {'dispatched': 0, 'acked': 0})['skipped'] = True
+        elif kind == 'enqueue':
+            self.state.setdefault(record['key'], {'dispatched': 0, 'acked': 0})['config'] = record['config']
+
+    def _open(self):
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        return self.file
+
+    def _append(self, record):
+        record['ts'] = round(time.time(), 3)
+        self._open().write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._apply(record)
+        self.records += 1
+        self.unsynced += 1
+
+    def sync(self):
+        """버퍼에 쌓인 기록을 디스크에 반영 (fsync)"""
+        with self.lock:
+            if self.file is not None and self.unsynced:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.unsynced = 0
+
+    def dispatch(self, key, n):
+        """n번째 전송 직전에 기록 (선기록: 전송 전에 바로 fsync하며 앞서 쌓인 ack도 함께 반영된다)"""
+        with self.lock:
+            self._append({'t': 'dispatch', 'key': key, 'n': n})
+            self.sync()
+
+    def ack(self, key, n, ok):
+        """n번째 전송 결과 기록 (프로세스 종료에 대비해 OS에는 바로 넘기고, fsync는 배치 단위)"""
+        with self.lock:
+            self._append({'t': 'ack', 'key': key, 'n': n, 'ok': bool(ok)})
+            self.file.flush()
+            if self.unsynced >= self.fsync_batch:
+                self.sync()
+            if self.records >= self.compact_threshold:
+                self.compact()
+
+    def cancel(self, key, n):
+        """n번째 전송을 보내지 않았음을 기록 (입력이 같아 생략한 회차는 횟수에 넣지 않음)"""
+        with self.lock:
+            self._append({'t': 'cancel', 'key': key, 'n': n})
+            self.file.flush()
+            if self.unsynced >= self.fsync_batch:
+                self.sync()
+
+    def skip(self, key):
+        """건너뛴 명령 기록 (재시작해도 남은 횟수를 다시 보내지 않음, 바로 fsync)"""
+        with self.lock:
+            self._append({'t': 'skip', 'key': key})
+            self.sync()
+
+    def enqueue(self, key, config):
+        """실행 중에 추가된 명령 기록 (재시작 시 큐 끝에 다시 추가됨, 바로 fsync)"""
+        with self.lock:
+            self._append({'t': 'enqueue', 'key': key, 'config': config})
+            self.sync()
+
+    def complete(self):
+        """모든 명령 완료: 저널을 비워서 다음 실행은 처음부터 시작"""
+        with self.lock:
+            self._write_atomically([{'t': 'complete', 'ts': round(time.time(), 3)}])
+            self.state = {}
+
+    def compact(self):
+        """현재 상태를 스냅샷 한 줄로 압축해서 저널이 끝없이 커지지 않게 한다"""
+        with self.lock:
+            self._write_atomically([{'t': 'snapshot', 'state': self.state, 'ts': round(time.time(), 3)}])
+
+    def _write_atomically(self, records):
+        self.close()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # 디렉토리 엔트리 교체까지 디스크에 반영
+        dir_fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        self.records = len(records)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.sync()
+                self.file.close()
+                self.file = None
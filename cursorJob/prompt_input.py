@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+프롬프트 입력 준비
+글자 단위 keystroke 대신 프롬프트 전체를 클립보드에 올려 한 번에 붙여넣는다
+필요하면 @파일 참조의 내용을 프롬프트에 직접 포함시킨다
+"""
+
+import os
+
+from completion import find_references
+
+
+class ClipboardUnavailable(Exception):
+    """클립보드를 사용할 수 없음 (pyperclip 미설치, 클립보드 도구 없음 등)"""
+
+
+def build_prompt(command, workspace_root, inline_refs=False):
+    """전송할 프롬프트 텍스트 생성 (inline_refs면 참조 파일 내용을 뒤에 덧붙임)"""
+    if not inline_refs:
+        return command
+    sections = [command]
+    for ref in find_references(command):
+        path = os.path.join(workspace_root, ref)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            sections.append(f"--- {ref} ---\n{f.read().rstrip()}")
+    return '\n\n'.join(sections)
+
+
+class ClipboardStager:
+    """pyperclip으로 클립보드에 프롬프트를 올리고, 붙여넣은 뒤 원래 내용을 복원"""
+
+    def __init__(self):
+        try:
+            import pyperclip
+        except ImportError:
+            raise ClipboardUnavailable("pyperclip이 설치되어 있지 않습니다 (pip install -r requirements.txt)")
+        self.pyperclip = pyperclip
+        try:
+            self.pyperclip.paste()
+        except pyperclip.PyperclipException as e:
+            raise ClipboardUnavailable(str(e) or "클립보드 복사/붙여넣기 도구를 찾을 수 없습니다")
+
+    def stage(self, text):
+        """클립보드에 text를 올리고 이전 내용(텍스트)을 반환"""
+        try:
+            previous = self.pyperclip.paste()
+        except self.pyperclip.PyperclipException:
+            previous = None
+        self.pyperclip.copy(text)
+        return previous
+
+    def restore(self, previous):
+        """stage 이전의 클립보드 내용으로 되돌림 (텍스트가 아니었던 경우는 복원하지 않음)"""
+        if previous is not None:
+            self.pyperclip.copy(previous)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+UI 준비 상태 감지
+고정 딜레이 대신 값싼 조건(최전면 앱, 채팅창 포커스 등)을 짧은 적응형 백오프로 폴링한다
+설정된 딜레이는 상한 타임아웃으로만 사용된다
+"""
+
+import random
+import time
+
+# 단계 이름
+STAGE_ACTIVATED = 'activated'        # 대상 앱이 최전면
+STAGE_CHAT_FOCUSED = 'chat_focused'  # 채팅 입력창에 포커스
+STAGE_TYPED = 'typed'                # 입력창에 텍스트가 들어감
+STAGE_SUBMITTED = 'submitted'        # 전송 후 입력창이 비워짐
+
+
+def wait_until(condition, timeout, initial_interval=0.02, max_interval=0.25, backoff=1.5,
+               sleep=time.sleep, clock=time.monotonic):
+    """조건이 참이 될 때까지 폴링 (준비되면 True, timeout 초과 시 False)"""
+    deadline = clock() + max(timeout, 0)
+    interval = initial_interval
+    while True:
+        if condition():
+            return True
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return False
+        sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+class NullReadinessProbe:
+    """항상 준비되지 않음으로 보고 (기존처럼 설정된 딜레이를 그대로 대기)"""
+
+    observable = False  # UI 상태를 실제로 확인할 수 있는지 (딜레이 보정에 사용)
+
+    def begin(self, stage):
+        pass
+
+    def is_ready(self, stage):
+        return False
+
+    def value_length(self):
+        return None
+
+
+class DriverReadinessProbe:
+    """UI 드라이버의 probe 요청으로 최전면 앱과 포커스된 입력창 상태를 확인"""
+
+    TEXT_ROLES = ('AXTextArea', 'AXTextField')
+    observable = True
+
+    def __init__(self, get_driver, app='Cursor'):
+        self.get_driver = get_driver
+        self.app = app
+        self.last_state = {}
+
+    def begin(self, stage):
+        pass
+
+    def is_ready(self, stage):
+        try:
+            state = self.get_driver().request('probe', app=self.app) or {}
+        except Exception:
+            return False
+        self.last_state = state
+
+        frontmost = state.get('frontmost') == self.app
+        text_focused = frontmost and state.get('focused_role') in self.TEXT_ROLES
+        value_length = state.get('value_length') or 0
+
+        if stage == STAGE_ACTIVATED:
+            return frontmost
+        if stage == STAGE_CHAT_FOCUSED:
+            return text_focused
+        if stage == STAGE_TYPED:
+            return text_focused and value_length > 0
+        if stage == STAGE_SUBMITTED:
+            return text_focused and value_length == 0
+        return False
+
+    def value_length(self):
+        """마지막으로 확인한 입력창 텍스트 길이"""
+        return self.last_state.get('value_length')
+
+
+class FakeReadinessProbe:
+    """테스트용: 각 단계가 begin() 이후 무작위 지연 뒤에 준비 완료로 보고"""
+
+    observable = True
+
+    def __init__(self, min_delay=0.0, max_delay=0.5, seed=None, clock=time.monotonic):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.random = random.Random(seed)
+        self.clock = clock
+        self.ready_at = {}
+
+    def begin(self, stage):
+        self.ready_at[stage] = self.clock() + self.random.uniform(self.min_delay, self.max_delay)
+
+    def is_ready(self, stage):
+        ready_at = self.ready_at.get(stage)
+        return ready_at is not None and self.clock() >= ready_at
+
+    def value_length(self):
+        return None
+
+
+def create_readiness_probe(config, get_driver, app='Cursor'):
+    """설정값(readiness_probe)에 맞는 준비 상태 감지기를 생성"""
+    kind = config.get('readiness_probe', 'driver')
+    if kind == 'driver':
+        return DriverReadinessProbe(get_driver, app)
+    if kind == 'fake':
+        fake = config.get('fake_readiness', {})
+        return FakeReadinessProbe(fake.get('min_delay', 0.0), fake.get('max_delay', 0.5), fake.get('seed'))
+    return NullReadinessProbe()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+전송 실패 재시도 정책과 회로 차단기
+- 오류 분류: UI 드라이버 오류 코드(osascript errorNumber), 종료 코드, stderr로 재시도 가능/불가를 판단
+- 재시도: 지수 백오프 + 지터 (실패한 시도는 명령의 max_count 횟수에서 빼지 않음)
+- 회로 차단기: 연속 실패가 일정 횟수를 넘으면 큐 전체를 멈추고, 가벼운 상태 확인으로 복구 여부를 판단
+
+config.json 예:
+    "retry": {"max_attempts": 3, "backoff": 5, "max_backoff": 120, "multiplier": 2, "jitter": 0.5}
+    "circuit_breaker": {"failure_threshold": 5, "cooldown": 30, "max_cooldown": 600}
+명령별로 "retry"를 적으면 전역 설정 위에 덮어쓴다
+"""
+
+import random
+import re
+import time
+
+from send_cache import MissingReferenceError
+from ui_driver import UIDriverError
+
+RETRYABLE = 'retryable'
+FATAL = 'fatal'
+
+# 실패 범위: 이 명령만의 문제인지, 사람이 환경을 고쳐야 하는 문제인지
+SCOPE_COMMAND = 'command'
+SCOPE_ENVIRONMENT = 'environment'
+
+# osascript/JXA 오류 번호
+FATAL_CODES = {
+    -1743: 'Apple Events 전송 권한 없음',
+    -1719: '손쉬운 사용(Accessibility) 권한 없음',
+    -25211: '손쉬운 사용(Accessibility) 권한 없음',
+}
+RETRYABLE_CODES = {
+    -600: '앱이 실행 중이 아님',
+    -609: '앱과의 연결이 끊어짐',
+    -1712: 'Apple Event 응답 시간 초과',
+    -1728: 'UI 요소를 찾을 수 없음',
+}
+FATAL_PATTERNS = (
+    (re.compile(r'not allowed assistive access|assistive access', re.I), '손쉬운 사용(Accessibility) 권한 없음'),
+    (re.compile(r'not authorized to send apple events', re.I), 'Apple Events 전송 권한 없음'),
+    (re.compile(r'no such file or directory|can\'t open file', re.I), 'UI 드라이버 실행 파일을 찾을 수 없음'),
+    (re.compile(r'syntax error|SyntaxError', re.I), 'UI 드라이버 스크립트 오류'),
+)
+
+
+class SendFailure:
+    """분류된 전송 실패"""
+
+    def __init__(self, kind, reason, scope=SCOPE_ENVIRONMENT):
+        self.kind = kind
+        self.reason = reason
+        self.scope = scope
+
+    @property
+    def retryable(self):
+        return self.kind == RETRYABLE
+
+    def __str__(self):
+        return f"{'재시도 가능' if self.retryable else '재시도 불가'}: {self.reason}"
+
+
+def classify_error(error):
+    """예외를 재시도 가능/불가로 분류 (알 수 없는 오류는 재시도 가능으로 보고 회로 차단기에 맡긴다)"""
+    if isinstance(error, MissingReferenceError):
+        return SendFailure(FATAL, str(error), SCOPE_COMMAND)
+    if isinstance(error, (FileNotFoundError, PermissionError)):
+        return SendFailure(FATAL, f"UI 드라이버를 실행할 수 없음: {error}")
+    if isinstance(error, UIDriverError):
+        if error.code in FATAL_CODES:
+            return SendFailure(FATAL, f"{FATAL_CODES[error.code]} ({error.code}): {error}")
+        if error.code in RETRYABLE_CODES:
+            return SendFailure(RETRYABLE, f"{RETRYABLE_CODES[error.code]} ({error.code}): {error}")
+        text = '\n'.join([str(error)] + list(error.stderr))
+        for pattern, reason in FATAL_PATTERNS:
+            if pattern.search(text):
+                return SendFailure(FATAL, f"{reason}: {error}")
+        if error.returncode not in (None, 0):
+            return SendFailure(RETRYABLE, f"UI 드라이버 종료 (코드 {error.returncode}): {error}")
+    return SendFailure(RETRYABLE, str(error) or type(error).__name__)
+
+
+class RetryPolicy:
+    """재시도 횟수와 지수 백오프 + 지터"""
+
+    def __init__(self, max_attempts=3, backoff=5.0, max_backoff=120.0, multiplier=2.0, jitter=0.5, rng=None):
+        self.max_attempts = max(int(max_attempts), 1)  # 첫 시도를 포함한 최대 시도 횟수
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.random = rng or random.Random()
+
+    @classmethod
+    def from_config(cls, config, default_backoff=5.0, rng=None):
+        return cls(config.get('max_attempts', 3), config.get('backoff', default_backoff),
+                   config.get('max_backoff', 120.0), config.get('multiplier', 2.0),
+                   config.get('jitter', 0.5), rng)
+
+    def should_retry(self, failure, attempt):
+        """attempt번째 시도가 실패했을 때 다시 시도할지"""
+        return failure.retryable and attempt < self.max_attempts
+
+    def delay(self, attempt):
+        """attempt번째 실패 후 대기 시간 (지터만큼 무작위로 줄여 여러 작업이 같은 시각에 몰리지 않게 함)"""
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter * self.random.random())
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold번이면 열림 → cooldown 뒤 상태 확인 성공 시 반열림(시험 전송 1회) → 성공하면 닫힘
+
+    상태 확인이나 시험 전송이 실패하면 cooldown을 두 배로 늘려 다시 열린다 (max_cooldown까지)
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0, max_cooldown=600.0, clock=time.monotonic):
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.retry_at = None
+        self.configure(threshold, cooldown, max_cooldown)
+
+    def configure(self, threshold, cooldown, max_cooldown):
+        """설정값 반영 (설정 파일 변경 시에도 현재 상태는 유지)"""
+        self.threshold = threshold  # 0이면 사용 안 함
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        if self.state == CLOSED:
+            self.cooldown = cooldown
+
+    def configure_from(self, config):
+        self.configure(config.get('failure_threshold', 5), config.get('cooldown', 30.0),
+                       config.get('max_cooldown', 600.0))
+
+    @property
+    def is_open(self):
+        return self.state == OPEN
+
+    def _open(self):
+        self.state = OPEN
+        self.retry_at = self.clock() + self.cooldown
+
+    def record_success(self):
+        """성공 기록 (열려 있거나 반열림이었으면 True: 복구됨)"""
+        recovered = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self.retry_at = None
+        return recovered
+
+    def record_failure(self):
+        """실패 기록 (이번 실패로 회로가 열렸으면 True)"""
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.reopen()
+            return True
+        if self.state == CLOSED and self.threshold and self.failures >= self.threshold:
+            self._open()
+            return True
+        return False
+
+    def reopen(self):
+        """상태 확인/시험 전송 실패: cooldown을 늘려 다시 열림"""
+        self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+        self._open()
+
+    def half_open(self):
+        """상태 확인 성공: 다음 전송 한 번을 시험으로 허용"""
+        self.state = HALF_OPEN
+        self.retry_at = None
+
+    def snapshot(self):
+        return {'state': self.state, 'consecutive_failures': self.failures,
+                'retry_in': round(max(self.retry_at - self.clock(), 0), 1) if self.retry_at else None}
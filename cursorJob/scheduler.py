@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+절대 시각 기반 스케줄러
+sleep을 이어 붙이는 대신 작업마다 monotonic 기준 예정 시각(deadline)을 두고 타이머 힙에서 가장 이른 작업을 꺼낸다
+- fixed_rate: 직전 예정 시각 + interval (전송 시간만큼 밀리지 않음, 밀린 회차는 몰아서 실행하지 않음)
+- fixed_delay: 이전 실행이 끝난 시각 + interval
+- 주기 명령: "09:00~18:00 사이 15분마다" 같은 벽시계 기준 일정 (며칠씩 실행해도 시각이 밀리지 않음)
+대기는 모두 Event로 구현되어 cancel() 한 번으로 즉시 깨울 수 있다
+"""
+
+import heapq
+import itertools
+import math
+import re
+import threading
+import time
+from datetime import timedelta
+
+FIXED_RATE = 'fixed_rate'
+FIXED_DELAY = 'fixed_delay'
+SCHEDULE_MODES = (FIXED_RATE, FIXED_DELAY)
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+DURATION_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$')
+
+
+def parse_duration(value):
+    """초 단위 숫자 또는 "30s", "15m", "2h", "1d" 형태의 문자열을 초로 변환"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = DURATION_PATTERN.match(str(value).lower())
+    if not match:
+        raise ValueError(f"잘못된 시간 간격: {value!r}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or 's']
+
+
+def parse_clock(value):
+    """ "09:00" -> 자정 기준 timedelta"""
+    hours, _, minutes = str(value).partition(':')
+    return timedelta(hours=int(hours), minutes=int(minutes or 0))
+
+
+def next_deadline(mode, deadline, finished, interval):
+    """다음 실행 예정 시각 (deadline: 이번 회차 예정 시각, finished: 이번 회차가 끝난 시각)"""
+    if mode == FIXED_DELAY or interval <= 0:
+        return finished + interval
+    upcoming = deadline + interval
+    if upcoming <= finished:
+        # 전송이 interval보다 오래 걸렸거나 일시정지되었던 경우: 지나간 회차는 건너뛰고 격자에 맞춤
+        missed = math.floor((finished - deadline) / interval)
+        upcoming = deadline + (missed + 1) * interval
+    return upcoming
+
+
+class CronSpec:
+    """벽시계 기준 주기 일정 (every 간격, 선택적으로 하루 중 시간대와 요일 제한)
+
+    실행 시각은 시간대 시작(없으면 자정) + k * every로 고정되어 있어서 실행이 늦어져도 다음 시각이 밀리지 않는다
+    """
+
+    def __init__(self, every, between=None, days=None):
+        self.every = timedelta(seconds=parse_duration(every))
+        if self.every <= timedelta(0):
+            raise ValueError("every는 0보다 커야 합니다")
+        if between:
+            self.start, self.end = parse_clock(between[0]), parse_clock(between[1])
+        else:
+            self.start, self.end = timedelta(0), timedelta(days=1) - timedelta(microseconds=1)
+        self.days = None
+        if days:
+            self.days = {WEEKDAYS.index(str(day).lower()[:3]) for day in days}
+
+    @classmethod
+    def from_config(cls, entry):
+        return cls(entry['every'], entry.get('between'), entry.get('days'))
+
+    def describe(self):
+        text = f"{int(self.every.total_seconds())}초마다"
+        if self.end - self.start < timedelta(days=1) - timedelta(microseconds=1):
+            text += f" ({_clock(self.start)}~{_clock(self.end)})"
+        if self.days is not None:
+            text += f" [{','.join(WEEKDAYS[d] for d in sorted(self.days))}]"
+        return text
+
+    def next_fire(self, after):
+        """after(로컬 datetime) 이후 첫 실행 시각"""
+        midnight = after.replace(hour=0, minute=0, second=0, microsecond=0)
+        # 자정을 넘기는 시간대(예: 22:00~02:00)는 전날 시작한 구간도 확인
+        for offset in range(-1, 9):
+            day = midnight + timedelta(days=offset)
+            if self.days is not None and day.weekday() not in self.days:
+                continue
+            window_start = day + self.start
+            window_end = day + self.end if self.end > self.start else day + timedelta(days=1) + self.end
+            if after < window_start:
+                candidate = window_start
+            else:
+                slots = math.floor((after - window_start) / self.every) + 1
+                candidate = window_start + slots * self.every
+            if candidate <= window_end:
+                return candidate
+        return None
+
+
+def _clock(delta):
+    minutes = int(delta.total_seconds()) // 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Job:
+    """스케줄러 작업 하나 (deadline은 monotonic 기준, wall_time은 벽시계 기준 작업만 사용)"""
+
+    def __init__(self, name, payload=None):
+        self.name = name
+        self.payload = payload
+        self.deadline = None
+        self.wall_time = None
+        self.count = 0
+
+    @property
+    def scheduled(self):
+        return self.deadline is not None
+
+
+class Scheduler:
+    def __init__(self, clock=time.monotonic, wall_clock=time.time):
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.lock = threading.Lock()
+        self.heap = []
+        self.sequence = itertools.count()
+        self.wakeup = threading.Event()  # 다음 작업을 다시 고르도록 메인 루프를 깨움
+        self.stopped = threading.Event()  # cancel() 이후 모든 대기가 즉시 반환
+        self.on_schedule = None  # 예약할 때마다 호출 (job, deadline) - 실행 트레이스용
+
+    @property
+    def cancelled(self):
+        return self.stopped.is_set()
+
+    def schedule(self, job, deadline):
+        """job을 monotonic 시각 deadline에 실행하도록 등록 (이미 등록되어 있으면 시각만 변경)"""
+        with self.lock:
+            job.deadline = deadline
+            job.wall_time = None
+            heapq.heappush(self.heap, (deadline, next(self.sequence), job))
+        if self.on_schedule:
+            self.on_schedule(job, deadline)
+
+    def schedule_wall(self, job, wall_time):
+        """job을 벽시계 시각(epoch 초)에 실행하도록 등록"""
+        self.schedule(job, self.clock() + max(wall_time - self.wall_clock(), 0))
+        job.wall_time = wall_time
+
+    def unschedule(self, job):
+        with self.lock:
+            job.deadline = None
+            job.wall_time = None
+
+    def next_job(self):
+        """가장 이른 작업 (등록된 작업이 없으면 None)"""
+        with self.lock:
+            while self.heap:
+                deadline, _, job = self.heap[0]
+                if job.deadline == deadline:
+                    return job
+                heapq.heappop(self.heap)  # 시각이 바뀌었거나 해제된 작업의 이전 항목
+            return None
+
+    def is_due(self, job):
+        if job.deadline is None:
+            return False
+        if job.wall_time is not None and self.wall_clock() >= job.wall_time:
+            return True  # 시스템 절전 등으로 monotonic 시계가 멈췄던 경우에도 벽시계 시각에 실행
+        return self.clock() >= job.deadline
+
+    def wait_for(self, job, tick=0.5, on_tick=None):
+        """job의 예정 시각까지 대기 (도달하면 True, wake()/cancel()로 깨면 False)
+
+        tick마다 on_tick을 호출하고 벽시계를 다시 확인한다
+        """
+        while not self.cancelled:
+            if on_tick:
+                on_tick()
+            if self.is_due(job):
+                return True
+            remaining = job.deadline - self.clock() if job.deadline is not None else tick
+            if self.wakeup.wait(min(max(remaining, 0), tick)):
+                self.wakeup.clear()
+                return False
+        return False
+
+    def sleep(self, seconds):
+        """취소 가능한 sleep (cancel()되면 바로 반환, 끝까지 잤으면 True)"""
+        deadline = self.clock() + seconds
+        while not self.cancelled:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return True
+            self.stopped.wait(remaining)
+        return False
+
+    def wake(self):
+        """대기 중인 루프를 깨워 다음 작업을 다시 고르게 함 (다른 스레드에서 호출 가능)"""
+        self.wakeup.set()
+
+    def cancel(self):
+        """모든 대기를 취소 (시그널 핸들러에서 호출해도 안전)"""
+        self.stopped.set()
+        self.wakeup.set()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+전송 생략 캐시
+전송 직전에 명령의 @파일 참조를 워크스페이스 루트 기준으로 확인하고,
+명령 텍스트 + 참조 파일 내용 + 워크스페이스 상태를 해시해서
+마지막으로 성공한 전송과 입력이 완전히 같으면 AI 요청을 다시 보내지 않는다
+@파일을 참조하는 명령에만 적용되며 기본은 꺼져 있다 (config.json의 send_cache_enabled: true로 사용)
+생략한 회차는 전송 횟수(max_count)에 넣지 않고, 다음 예정 시각에 입력을 다시 확인한다
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from completion import find_references
+
+DEFAULT_EXCLUDE = ('.git', 'node_modules', 'venv', '.venv', '__pycache__')
+
+
+class MissingReferenceError(Exception):
+    """명령이 참조하는 @파일이 워크스페이스에 없음"""
+
+    def __init__(self, missing, workspace_root):
+        self.missing = missing
+        self.workspace_root = workspace_root
+        super().__init__(f"참조 파일을 찾을 수 없습니다: {', '.join(missing)} (워크스페이스 루트: {workspace_root})")
+
+
+class InputsUnchanged(Exception):
+    """마지막으로 성공한 전송과 입력이 같아서 전송을 생략함"""
+
+    def __init__(self, command, sent_at):
+        self.command = command
+        self.sent_at = sent_at
+        super().__init__(f"입력 변경 없음: {command}")
+
+
+def is_file_reference(ref):
+    """@codebase, @web 같은 Cursor 컨텍스트 기호가 아닌 파일 경로 참조인지 판단"""
+    return '.' in ref or '/' in ref
+
+
+def resolve_references(command, workspace_root):
+    """명령의 @파일 참조를 절대경로 목록으로 변환 (없는 파일이 있으면 MissingReferenceError)"""
+    resolved = []
+    missing = []
+    for ref in find_references(command):
+        if not is_file_reference(ref):
+            continue
+        path = os.path.normpath(os.path.join(workspace_root, ref))
+        if os.path.isfile(path):
+            resolved.append((ref, path))
+        else:
+            missing.append(ref)
+    if missing:
+        raise MissingReferenceError(missing, workspace_root)
+    return resolved
+
+
+def iter_workspace_files(root, exclude=DEFAULT_EXCLUDE):
+    """워크스페이스 파일의 (상대경로, 절대경로, stat)을 경로 순서대로 (숨김/제외 디렉토리는 건너뜀)"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in exclude and not d.startswith('.'))
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # 탐색 중에 삭제된 파일
+            yield os.path.relpath(path, root), path, stat
+
+
+def workspace_fingerprint(root, exclude=DEFAULT_EXCLUDE):
+    """워크스페이스 파일들의 (경로, mtime, 크기) 해시 (AI가 파일을 바꾸면 값이 달라짐)"""
+    digest = hashlib.sha256()
+    for relpath, _, stat in iter_workspace_files(root, exclude):
+        digest.update(f"{relpath}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SendCache:
+    """입력 해시 -> 마지막 성공 전송 기록 (JSON 파일에 유지)"""
+
+    def __init__(self, path, workspace_state=True, exclude=DEFAULT_EXCLUDE, max_entries=1000):
+        self.path = path
+        self.workspace_state = workspace_state
+        self.exclude = tuple(exclude)
+        self.max_entries = max_entries
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}  # 처음 실행이거나 손상된 파일이면 빈 캐시로 시작
+        return entries if isinstance(entries, dict) else {}
+
+    def digest(self, command, workspace_root):
+        """명령 텍스트, 참조 파일 내용, (옵션) 워크스페이스 상태의 해시"""
+        digest = hashlib.sha256(command.encode('utf-8'))
+        for ref, path in resolve_references(command, workspace_root):
+            digest.update(f"\0{ref}\0".encode('utf-8'))
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(65536), b''):
+                    digest.update(block)
+        if self.workspace_state:
+            digest.update(workspace_fingerprint(workspace_root, self.exclude).encode('ascii'))
+        return digest.hexdigest()
+
+    def check(self, command, workspace_root):
+        """전송 전 확인: 입력 해시를 반환하고, 이미 같은 입력으로 보낸 적이 있으면 InputsUnchanged"""
+        digest = self.digest(command, workspace_root)
+        entry = self.entries.get(digest)
+        if entry is not None:
+            raise InputsUnchanged(command, entry.get('sent_at'))
+        return digest
+
+    def record(self, digest, command):
+        """성공한 전송의 입력 해시를 기록 (오래된 항목부터 정리)"""
+        self.entries.pop(digest, None)
+        self.entries[digest] = {'command': command, 'sent_at': time.time()}
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+        self._save()
+
+    def discard(self, digest):
+        """기록 취소 (전송은 되었지만 결과 검증에 실패해서 같은 입력으로 다시 보내야 할 때)"""
+        if self.entries.pop(digest, None) is not None:
+            self._save()
+
+    def clear(self):
+        self.entries = {}
+        self._save()
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
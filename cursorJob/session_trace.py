@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+실행 트레이스 기록
+log_message의 사람용 로그와 별도로, 스케줄링 결정/UI 단계/대기/재시도/설정 반영을
+monotonic 기준 시각과 함께 한 줄에 하나씩 JSON(NDJSON)으로 기록한다
+trace_replay.py로 타임라인과 구간별 소요 시간을 분석하거나 가상 백엔드로 다시 실행할 수 있다
+
+레코드 형식: {"t": 세션 시작 후 경과 초, "ev": 이벤트 종류, ...}
+    session   세션 시작 (wall: 시작 시각 epoch, settings: 스케줄링 관련 설정)
+    schedule  작업 예약 (job, at: 예정 시각)
+    wait      예정 시각까지 대기 (job, dur, due: 시각에 도달했는지)
+    run       작업 실행 (job, late: 예정 시각보다 늦은 정도)
+    step      실행 큐 명령 한 회차 시작 (cmd, key, n, interval, max_count, mode, completion, timeout)
+    phase     UI/대기 단계 (phase, cmd, dur) - t는 단계가 끝난 시각
+    send      전송 결과 (cmd, ok, reason) / unchanged: 입력이 같아 생략
+    complete  완료 감지 (cmd, ok, dur)
+    verify    결과 검증 (cmd, passed, detail)
+    retry     재시도 예약 (cmd, attempt, delay, reason)
+    breaker   회로 차단기 상태 변경 (state, cooldown)
+    pause     일시정지 구간 (dur)
+    reload    설정 파일 반영 (added, changed, removed)
+    control   제어 소켓 요청 (request)
+    end       세션 종료
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class NullTrace:
+    """트레이스를 기록하지 않음"""
+
+    def open(self, **header):
+        pass
+
+    def emit(self, event, **fields):
+        pass
+
+    def at(self, monotonic):
+        return None
+
+    def close(self):
+        pass
+
+
+class TraceRecorder:
+    def __init__(self, path, flush_every=32, clock=time.monotonic):
+        self.path = path
+        self.flush_every = flush_every
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.file = None
+        self.origin = 0.0
+        self.unflushed = 0
+
+    def open(self, **header):
+        """새 트레이스 시작 (이전 트레이스는 .1로 보관)"""
+        if os.path.exists(self.path):
+            os.replace(self.path, self.path + '.1')
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.origin = self.clock()
+        self.emit('session', wall=round(time.time(), 3), pid=os.getpid(), **header)
+
+    def at(self, monotonic):
+        """monotonic 시각을 트레이스 기준 시각으로 변환"""
+        return round(monotonic - self.origin, 6)
+
+    def emit(self, event, **fields):
+        if self.file is None:
+            return
+        record = {'t': self.at(self.clock()), 'ev': event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(line)
+            self.unflushed += 1
+            if self.unflushed >= self.flush_every:
+                self.file.flush()
+                self.unflushed = 0
+
+    def close(self):
+        if self.file is None:
+            return
+        self.emit('end')
+        with self.lock:
+            self.file.close()
+            self.file = None
+
+
+def create_trace(config):
+    """설정값(trace_file)에 맞는 트레이스 기록기 (비어 있으면 기록하지 않음)"""
+    path = config.get('trace_file', '/tmp/optimized_automation.trace')
+    return TraceRecorder(path, config.get('trace_flush_every', 32)) if path else NullTrace()
+
+
+def read_trace(path):
+    """트레이스 파일을 레코드 목록으로 읽음 (기록 도중 끊긴 마지막 줄은 무시)"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return records
@@ -29,4 +29,5 @@ echo ""
 echo "📋 사용 가능한 명령어:"
 echo "   상태 확인: ./status_automation.sh"
 echo "   중단하기:  ./stop_automation.sh"
+echo "   제어하기:  python3 automation_ctl.py status|pause|resume|skip|enqueue <명령>"
 echo "   로그 보기:  tail -f /tmp/optimized_automation.log"
@@ -2,6 +2,44 @@
 
 echo "=== Cursor IDE 자동화 상태 확인 도구 ==="
 
+# 제어 소켓 경로: config.json의 control_socket (없으면 기본 경로, null이면 사용 안 함)
+SOCKET_PATH="/tmp/optimized_automation.sock"
+if [ -f "config.json" ]; then
+    if grep -Eq '"control_socket"[[:space:]]*:[[:space:]]*null' config.json; then
+        SOCKET_PATH=""
+    else
+        CONFIGURED=$(sed -n 's/.*"control_socket"[[:space:]]*:[[:space:]]*"\([^"]*\)".*/\1/p' config.json | head -n 1)
+        if [ -n "$CONFIGURED" ]; then
+            SOCKET_PATH="$CONFIGURED"
+        fi
+    fi
+fi
+
+# 데몬이 실행 중이면 Python을 띄우지 않고 소켓에 바로 요청 (nc -U 또는 socat)
+query_socket() {
+    if command -v nc >/dev/null 2>&1; then
+        printf 'status\n' | nc -U -w 2 "$SOCKET_PATH" 2>/dev/null
+    elif command -v socat >/dev/null 2>&1; then
+        printf 'status\n' | socat -t 2 - "UNIX-CONNECT:$SOCKET_PATH" 2>/dev/null
+    else
+        return 1
+    fi
+}
+
+if [ -n "$SOCKET_PATH" ] && [ -S "$SOCKET_PATH" ]; then
+    RESPONSE=$(query_socket)
+    if [ -n "$RESPONSE" ]; then
+        if command -v jq >/dev/null 2>&1; then
+            printf '%s\n' "$RESPONSE" | jq .
+        else
+            printf '%s\n' "$RESPONSE"
+        fi
+        exit 0
+    fi
+fi
+
+# 데몬에 연결할 수 없으면 (중단됨, 소켓 꺼짐, nc/socat 없음) 잠금 파일과 로그로 상태 확인
+
 # 가상환경 활성화
 if [ -d "./venv" ]; then
     source ./venv/bin/activate
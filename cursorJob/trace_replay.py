@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+실행 트레이스 분석 / 재실행
+데몬이 기록한 트레이스(session_trace.py, 기본 /tmp/optimized_automation.trace)로
+밤새 실행이 어디서 시간을 썼는지 확인하고, 가상 백엔드로 같은 조건을 다시 돌려 스케줄링 설정을 비교한다
+Mac이나 Cursor 없이(Linux 포함) 실행할 수 있다
+
+사용법:
+    python3 trace_replay.py /tmp/optimized_automation.trace
+    python3 trace_replay.py TRACE --timeline 0                  # 타임라인 전체 출력
+    python3 trace_replay.py TRACE --replay --speed 20           # 20배속으로 다시 실행해서 비교
+    python3 trace_replay.py TRACE --replay --set schedule_mode=fixed_delay --set command_interval_delay=0
+
+구간 (실행 큐는 한 번에 한 명령씩 순서대로 실행되므로 메인 루프 시간이 곧 크리티컬 패스):
+    startup     첫 작업 실행 전 (시작 대기, 최초 채팅창 활성화)
+    input       UI 입력 (send 단계: activate/focus/keystroke/submit)
+    completion  AI 작업 완료 대기
+    verify      결과 검증
+    idle        다음 예정 시각까지 대기 (interval, 명령 간 대기, 재시도 백오프, 회로 차단기)
+    paused      일시정지
+    overhead    나머지 (스케줄링, 로그, 저널, 전송 캐시 확인 등)
+
+재실행은 기록된 명령 순서와 설정, 회차별 입력 시간/전송 성공 여부/완료 대기 시간을 가상 백엔드로 재현한다
+- 명령마다 기록된 회차 수만큼만 보낸다 (이어서 시작했거나 도중에 멈춘 실행도 기록된 구간만 재현)
+- 결과 검증은 기록된 통과/실패와 on_fail을 그대로 재현
+- 입력이 같아 생략된 전송은 회차에 넣지 않으므로 재현하지 않는다 (재실행은 전송 캐시를 쓰지 않음)
+- 시간은 --speed배 빠르게 실행한 뒤 다시 곱해서 보여준다 (대기/폴링 간격도 1/배속으로 줄임)
+  sleep 한 번의 고정 비용은 줄지 않고 배속만큼 부풀려지므로 배속을 너무 높이면 기록과 어긋난다
+- 설정을 바꾸지 않은 재실행(기준)의 전체 시간이 기록과 --tolerance 이상 다르면 경고하고 종료 코드 1을 반환한다
+  --set을 주면 기준 재실행도 함께 돌려서 같은 오차를 가진 기준과 비교한다
+- 주기 명령은 분석만 지원
+여러 워크스페이스 실행은 워크스페이스별 구간이 서로 겹쳐 메인 루프 기준 구간 분석이 맞지 않으므로 지원하지 않는다
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+from backends import SimulatedCompletionProbe
+from completion import find_references
+from optimized_automation import OptimizedCursorAutomation
+from send_cache import is_file_reference
+from session_trace import read_trace
+from verification import ON_FAIL_ADVANCE, ON_FAIL_RETRY, VerificationResult, WorkspaceDiff
+
+CATEGORIES = ('startup', 'input', 'completion', 'verify', 'idle', 'paused', 'overhead')
+PHASE_CATEGORIES = {'send': 'input', 'wait_completion': 'completion', 'verify': 'verify'}
+
+# 재실행 시 배속에 맞춰 줄이는 설정값
+SCALED_SETTINGS = ('command_interval_delay', 'completion_timeout', 'error_retry_delay', 'startup_delay')
+SCALED_RETRY = {'backoff': None, 'max_backoff': 120.0}
+SCALED_BREAKER = {'cooldown': 30.0, 'max_cooldown': 600.0}
+COMMAND_OVERRIDES = ('interval', 'schedule_mode', 'timeout')
+
+
+def _new_row(record, idle, periodic=False):
+    return {'t': record['t'], 'cmd': record.get('cmd'), 'key': record.get('key'), 'n': record.get('n'),
+            'periodic': periodic, 'idle': idle, 'input': 0.0, 'completion': 0.0, 'verify': 0.0,
+            'outcome': None, 'reason': None, 'completed': None, 'verified': None, 'on_fail': None, 'retry': None,
+            'step': record if not periodic else None}
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def analyze(records):
+    """트레이스 레코드에서 회차별 타임라인과 구간별 누적 시간을 계산"""
+    totals = dict.fromkeys(CATEGORIES, 0.0)
+    ui_phases = {}
+    rows = []
+    row = None
+    idle = 0.0
+    lateness = []
+    workspaces = None
+    for record in records:
+        event = record.get('ev')
+        if event == 'session':
+            workspaces = record.get('settings', {}).get('workspaces')
+        elif event == 'wait':
+            totals['idle'] += record['dur']
+            idle += record['dur']
+        elif event == 'pause':
+            totals['paused'] += record['dur']
+        elif event == 'run':
+            if not lateness:
+                totals['startup'] = max(record['t'] - totals['idle'] - totals['paused'], 0.0)
+            lateness.append(max(record.get('late', 0.0), 0.0))
+            row = None
+            if record['job'] not in ('queue', 'circuit_breaker'):
+                row = _new_row(record, idle, periodic=True)
+                rows.append(row)
+                idle = 0.0
+        elif event == 'step':
+            row = _new_row(record, idle)
+            rows.append(row)
+            idle = 0.0
+        elif event == 'phase':
+            category = PHASE_CATEGORIES.get(record['phase'])
+            if category is None:
+                ui_phases[record['phase']] = ui_phases.get(record['phase'], 0.0) + record['dur']
+                continue
+            totals[category] += record['dur']
+            if row is not None:
+                row[category] += record['dur']
+        elif row is None:
+            if event == 'send' and not workspaces:
+                workspaces = True  # workspaces 설정을 기록하기 전의 트레이스: 실행 큐 밖에서 전송됨
+            continue
+        elif event == 'send':
+            row['cmd'] = row['cmd'] or record['cmd']
+            if record.get('unchanged'):
+                row['outcome'] = 'unchanged'
+            else:
+                row['outcome'] = 'ok' if record['ok'] else 'fail'
+                row['reason'] = record.get('reason')
+        elif event == 'complete':
+            row['completed'] = record['ok']
+        elif event == 'verify':
+            row['verified'] = record['passed']
+            row['on_fail'] = record.get('on_fail', ON_FAIL_RETRY)  # on_fail을 기록하기 전에는 retry가 기본값
+            if not record['passed']:
+                row['outcome'] = 'verify_fail'
+                row['reason'] = record.get('detail')
+        elif event == 'retry':
+            row['retry'] = record['delay']
+
+    wall = records[-1]['t'] if records else 0.0
+    if not lateness:
+        totals['startup'] = max(wall - sum(v for k, v in totals.items() if k not in ('startup', 'overhead')), 0.0)
+    totals['overhead'] = max(wall - sum(v for k, v in totals.items() if k != 'overhead'), 0.0)
+
+    commands = {}
+    for r in rows:
+        busy = commands.setdefault(r['cmd'], {'sends': 0, 'seconds': 0.0})
+        busy['sends'] += 1
+        busy['seconds'] += r['idle'] + r['input'] + r['completion'] + r['verify']
+    return {
+        'wall': wall,
+        'workspaces': workspaces,
+        'totals': totals,
+        'ui_phases': ui_phases,
+        'rows': rows,
+        'sends': sum(1 for r in rows if r['outcome'] in ('ok', 'verify_fail')),
+        'failures': sum(1 for r in rows if r['outcome'] in ('fail', 'verify_fail')),
+        'lateness': {'mean': sum(lateness) / len(lateness) if lateness else 0.0,
+                     'p95': _percentile(lateness, 0.95), 'max': max(lateness, default=0.0)},
+        'commands': commands,
+    }
+
+
+def scaled(result, factor):
+    """배속 재실행 결과를 원래 시간 단위로 환산 (타임라인 제외)"""
+    return dict(result,
+                wall=result['wall'] * factor,
+                totals={k: v * factor for k, v in result['totals'].items()},
+                ui_phases={k: v * factor for k, v in result['ui_phases'].items()},
+                lateness={k: v * factor for k, v in result['lateness'].items()},
+                commands={cmd: dict(c, seconds=c['seconds'] * factor) for cmd, c in result['commands'].items()})
+
+
+class Attempt:
+    """기록된 전송 한 회차"""
+
+    def __init__(self, input_seconds, ok, completion=0.0, completed=True, reason=None, verified=None,
+                 on_fail=ON_FAIL_ADVANCE):
+        self.input = input_seconds
+        self.ok = ok
+        self.completion = completion
+        self.completed = completed
+        self.reason = reason
+        self.verified = verified  # None이면 검증하지 않은 회차
+        self.on_fail = on_fail
+
+
+def recorded_attempts(rows):
+    """명령별 전송 회차 목록 (실행 큐만)"""
+    attempts = {}
+    for r in rows:
+        if r['periodic'] or r['outcome'] in (None, 'unchanged'):
+            continue
+        attempt = Attempt(r['input'], r['outcome'] != 'fail', r['completion'], r['completed'] is not False,
+                              r['reason'], r['verified'], r['on_fail'] or ON_FAIL_ADVANCE)
+        attempts.setdefault(r['cmd'], deque()).append(attempt)
+    return attempts
+
+
+class ReplayVerifier:
+    """기록된 검증 결과를 돌려주는 검증기 (직전에 보낸 회차 기준)"""
+
+    timeout = 0
+    description = '기록된 검증 결과'
+
+    def __init__(self, backend, command):
+        self.backend = backend
+        self.command = command
+
+    @property
+    def on_fail(self):
+        attempt = self.backend.last_attempt.get(self.command)
+        return attempt.on_fail if attempt is not None else ON_FAIL_ADVANCE
+
+    def arm(self):
+        pass
+
+    def check(self):
+        attempt = self.backend.last_attempt.get(self.command)
+        failures = [] if attempt is None or attempt.verified is not False else [f"기록된 검증 실패: {attempt.reason}"]
+        return VerificationResult(failures, WorkspaceDiff([], [], []))
+
+
+class ReplayBackend:
+    """기록된 회차를 순서대로 재현하는 가상 백엔드 (기록보다 많이 보내면 성공한 회차의 평균값 사용)"""
+
+    def __init__(self, attempts, completion_commands, speed=1.0, activation=0.0, clock=time.monotonic):
+        self.attempts = attempts
+        self.completion_commands = set(completion_commands)
+        self.verified_commands = {command for command, queue in attempts.items()
+                                  if any(a.verified is not None for a in queue)}
+        self.speed = speed
+        self.activation = activation
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.busy_until = {}
+        self.last_attempt = {}
+        self.defaults = {}
+        for command, queue in attempts.items():
+            ok = [a for a in queue if a.ok and a.verified is not False]
+            if ok:
+                self.defaults[command] = Attempt(sum(a.input for a in ok) / len(ok), True,
+                                                 sum(a.completion for a in ok) / len(ok))
+
+    def activate_chat(self):
+        time.sleep(self.activation / self.speed)
+
+    def create_verifier(self, command_config, workspace):
+        """OptimizedCursorAutomation.create_verifier 대체: 기록에서 검증한 명령만 검증"""
+        command = command_config.get('command')
+        return ReplayVerifier(self, command) if command in self.verified_commands else None
+
+    def send(self, workspace, command, command_config):
+        queue = self.attempts.get(command)
+        attempt = queue.popleft() if queue else self.defaults.get(command, Attempt(0.0, True))
+        self.last_attempt[command] = attempt
+        time.sleep(attempt.input / self.speed)
+        if not attempt.ok:
+            raise RuntimeError(f"기록된 전송 실패: {attempt.reason}")
+        with self.lock:
+            work = attempt.completion / self.speed if attempt.completed else float('inf')
+            self.busy_until[workspace.name] = self.clock() + work
+        return True
+
+    def is_complete(self, workspace):
+        with self.lock:
+            return self.clock() >= self.busy_until.get(workspace.name, 0)
+
+    def completion_probe(self, workspace, command_config):
+        if command_config.get('command') in self.completion_commands:
+            return SimulatedCompletionProbe(self, workspace)
+        return None
+
+    def health_check(self):
+        return True, "재실행"
+
+    def close(self):
+        pass
+
+
+def _parse_override(text):
+    key, _, value = text.partition('=')
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def replay_config(records, rows, speed, overrides, workdir):
+    """기록된 설정과 명령 순서로 재실행용 설정을 만든다 (시간 값은 배속만큼 줄임)"""
+    settings = dict(records[0].get('settings', {})) if records and records[0].get('ev') == 'session' else {}
+    settings.update(overrides)
+
+    # 기록된 회차만 재실행 (저널에서 이어서 시작했거나 도중에 멈춘 실행을 전체 큐로 부풀리지 않음)
+    rounds = {}
+    for r in rows:
+        if r['step'] is not None:
+            rounds.setdefault(r['step']['key'], set()).add(r['step']['n'])
+
+    commands = {}
+    for r in rows:
+        step = r['step']
+        if step is None or step['key'] in commands:
+            continue
+        entry = {'command': step['cmd'], 'interval': step['interval'], 'max_count': len(rounds[step['key']]),
+                 'schedule_mode': step['mode'], 'timeout': step['timeout']}
+        entry.update({key: overrides[key] for key in COMMAND_OVERRIDES if key in overrides})
+        entry['interval'] /= speed
+        entry['timeout'] /= speed
+        commands[step['key']] = entry
+
+    # @파일 참조는 빈 파일로 만들어 참조 확인을 통과시킴
+    workspace_root = os.path.join(workdir, 'workspace')
+    for entry in commands.values():
+        for ref in find_references(entry['command']):
+            path = os.path.normpath(os.path.join(workspace_root, ref))
+            if is_file_reference(ref) and path.startswith(workdir + os.sep):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                open(path, 'a').close()
+
+    retry = dict(settings.get('retry') or {})
+    for key, default in SCALED_RETRY.items():
+        value = retry.get(key, default)
+        if value is not None:
+            retry[key] = value / speed
+    breaker = dict(settings.get('circuit_breaker') or {})
+    for key, default in SCALED_BREAKER.items():
+        breaker[key] = breaker.get(key, default) / speed
+
+    config = {key: settings[key] / speed for key in SCALED_SETTINGS if key in settings}
+    config.update({
+        'commands': list(commands.values()),
+        'schedule_mode': settings.get('schedule_mode', 'fixed_rate'),
+        'retry': retry,
+        'circuit_breaker': breaker,
+        'workspace_root': workspace_root,
+        'ui_backend': 'simulated',
+        'readiness_probe': 'none',
+        'lock_file': os.path.join(workdir, 'replay.lock'),
+        'trace_file': os.path.join(workdir, 'replay.trace'),
+        'control_socket': None,
+        'journal_enabled': False,
+        'send_cache_enabled': False,
+        'delay_profile_file': None,
+        'metrics_file': None,
+        'config_watch': False,
+        'poll_scale': 1.0 / speed,
+    })
+    return config
+
+
+def run_replay(records, original, speed, overrides, verbose=False):
+    """가상 백엔드로 다시 실행하고 결과를 원래 시간 단위로 반환"""
+    with tempfile.TemporaryDirectory(prefix='automation-replay-') as workdir:
+        config = replay_config(records, original['rows'], speed, overrides, workdir)
+        completion_commands = {r['cmd'] for r in original['rows'] if r['step'] and r['step'].get('completion')}
+        # 시작 구간 중 시작 대기를 뺀 나머지는 최초 채팅창 활성화로 재현
+        activation = max(original['totals']['startup'] - config.get('startup_delay', 1.0 / speed) * speed, 0.0)
+        automation = OptimizedCursorAutomation(config=config)
+        automation.backend = ReplayBackend(recorded_attempts(original['rows']), completion_commands, speed, activation)
+        automation.create_verifier = automation.backend.create_verifier
+        if not verbose:
+            automation.log_message = lambda message: None
+        automation.run_automation()
+        return scaled(analyze(read_trace(config['trace_file'])), speed)
+
+
+def print_breakdown(result, title):
+    wall = result['wall']
+    rate = result['sends'] / wall * 60 if wall else 0.0
+    print(f"== {title}: {wall:.1f}초, 전송 {result['sends']}회 (실패 {result['failures']}회), {rate:.2f} sends/min")
+    for category, seconds in sorted(result['totals'].items(), key=lambda item: -item[1]):
+        share = seconds / wall if wall else 0.0
+        print(f"  {category:<11} {seconds:>10.2f}s {share:>7.1%}  {'#' * round(share * 40)}")
+    if result['ui_phases']:
+        phases = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in
+                           sorted(result['ui_phases'].items(), key=lambda item: -item[1]))
+        print(f"  input 세부: {phases}")
+    lateness = result['lateness']
+    print(f"  예정 시각 대비 지연: 평균 {lateness['mean'] * 1000:.1f}ms, p95 {lateness['p95'] * 1000:.1f}ms, "
+          f"최대 {lateness['max'] * 1000:.1f}ms")
+    top = sorted(result['commands'].items(), key=lambda item: -item[1]['seconds'])[:5]
+    if top:
+        print("  시간을 가장 많이 쓴 명령:")
+        for command, stats in top:
+            print(f"    {stats['seconds']:>10.2f}s  {stats['sends']:>4}회  {command}")
+
+
+def print_timeline(rows, limit):
+    print(f"{'t(s)':>10} {'idle':>8} {'input':>7} {'wait':>8} {'verify':>7}  {'결과':<11} 명령")
+    shown = rows if limit <= 0 else rows[:limit]
+    for r in shown:
+        outcome = r['outcome'] or '-'
+        if r['retry'] is not None:
+            outcome += f" (재시도 {r['retry']:.1f}s)"
+        command = f"{'[주기] ' if r['periodic'] else ''}{r['cmd']}" + (f" #{r['n']}" if r['n'] else '')
+        print(f"{r['t']:>10.2f} {r['idle']:>8.2f} {r['input']:>7.2f} {r['completion']:>8.2f} {r['verify']:>7.2f}  "
+              f"{outcome:<11} {command}")
+    if len(shown) < len(rows):
+        print(f"   ... {len(rows) - len(shown)}개 더 (--timeline 0으로 전체 출력)")
+
+
+def fidelity(original, baseline):
+    """설정을 바꾸지 않은 재실행과 기록의 전체 시간 차이 (기록 대비 비율)"""
+    if not original['wall']:
+        return 0.0
+    return (baseline['wall'] - original['wall']) / original['wall']
+
+
+def print_comparison(original, baseline, replay=None):
+    """기록과 기준 재실행, (--set이 있으면) 설정을 바꾼 재실행을 구간별로 비교 (차이는 기준 재실행 대비)"""
+    reference, after_label = (original, '재실행(s)') if replay is None else (baseline, '변경(s)')
+    replay = replay or baseline
+    header = f"{'구간':<11} {'기록(s)':>10} {'기준(s)':>10}"
+    print(header + (f" {after_label:>10}" if replay is not baseline else '') + f" {'차이(s)':>10}")
+    for category in ('wall',) + CATEGORIES:
+        values = [result['wall'] if category == 'wall' else result['totals'][category]
+                  for result in (original, baseline, replay)]
+        row = f"{category:<11} {values[0]:>10.2f} {values[1]:>10.2f}"
+        if replay is not baseline:
+            row += f" {values[2]:>10.2f}"
+        before = values[0] if reference is original else values[1]
+        print(row + f" {values[2] - before:>+10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='실행 트레이스 분석 및 가상 백엔드 재실행')
+    parser.add_argument('trace', nargs='?', default='/tmp/optimized_automation.trace', help='트레이스 파일')
+    parser.add_argument('--timeline', type=int, default=30, help='타임라인 출력 행 수 (0: 전체)')
+    parser.add_argument('--replay', action='store_true', help='가상 백엔드로 다시 실행해서 비교')
+    parser.add_argument('--speed', type=float, default=20.0, help='재실행 배속 (기본 20)')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help='기준 재실행과 기록의 전체 시간 허용 오차 비율 (기본 0.05)')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='재실행 설정 변경 (예: schedule_mode=fixed_delay, command_interval_delay=0, interval=5)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    parser.add_argument('-v', '--verbose', action='store_true', help='재실행 로그 출력')
+    args = parser.parse_args()
+
+    try:
+        records = read_trace(args.trace)
+    except OSError as e:
+        print(f"❌ 트레이스를 읽을 수 없습니다: {e}", file=sys.stderr)
+        return 1
+    if not records:
+        print(f"❌ 트레이스가 비어 있습니다: {args.trace}", file=sys.stderr)
+        return 1
+
+    original = analyze(records)
+    if original['workspaces']:
+        print("❌ 여러 워크스페이스 병렬 실행 트레이스는 분석/재실행을 지원하지 않습니다 "
+              "(워크스페이스별 구간이 서로 겹침)", file=sys.stderr)
+        print("   워크스페이스별 전송 결과는 로그, 단계별 소요 시간은 metrics 요청으로 확인하세요", file=sys.stderr)
+        return 1
+    baseline = replay = None
+    drift = 0.0
+    if args.replay:
+        # 설정을 바꾸지 않은 기준 재실행이 기록과 맞아야 --set 비교를 믿을 수 있음
+        baseline = run_replay(records, original, args.speed, {}, args.verbose)
+        drift = fidelity(original, baseline)
+        if args.set:
+            overrides = dict(_parse_override(text) for text in args.set)
+            replay = run_replay(records, original, args.speed, overrides, args.verbose)
+    faithful = abs(drift) <= args.tolerance
+
+    if args.json:
+        output = {'recorded': {k: v for k, v in original.items() if k != 'rows'}}
+        output['recorded']['timeline'] = [{k: v for k, v in r.items() if k != 'step'} for r in original['rows']]
+        if baseline:
+            output['baseline'] = {k: v for k, v in baseline.items() if k != 'rows'}
+            output['fidelity'] = {'drift': drift, 'tolerance': args.tolerance, 'ok': faithful}
+        if replay:
+            output['replay'] = {k: v for k, v in replay.items() if k != 'rows'}
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+        return 0 if faithful else 1
+
+    print_timeline(original['rows'], args.timeline)
+    print()
+    print_breakdown(original, f"기록 ({args.trace})")
+    if baseline:
+        print()
+        print_breakdown(baseline, f"기준 재실행 ({args.speed:g}배속)")
+        if replay:
+            print()
+            print_breakdown(replay, f"재실행 ({args.speed:g}배속, {', '.join(args.set)})")
+        print()
+        print_comparison(original, baseline, replay)
+        print()
+        if faithful:
+            print(f"✅ 기준 재실행이 기록과 {drift:+.1%} 차이 (허용 ±{args.tolerance:.0%})")
+        else:
+            print(f"⚠️  기준 재실행이 기록과 {drift:+.1%} 차이 (허용 ±{args.tolerance:.0%}) - "
+                  f"재실행 결과를 믿을 수 없습니다, --speed를 낮춰 보세요", file=sys.stderr)
+    return 0 if faithful else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+상주형 UI 드라이버 클라이언트
+osascript 프로세스를 한 번만 띄워두고 파이프로 요청을 주고받는 방식
+"""
+
+import json
+import os
+import queue
+import subprocess
+import threading
+from collections import deque
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DRIVER_COMMAND = ['osascript', '-l', 'JavaScript', 'cursor_driver.js']
+
+
+class UIDriverError(Exception):
+    """UI 드라이버 요청 실패 (code: osascript 오류 번호, returncode: 드라이버 프로세스 종료 코드)"""
+
+    def __init__(self, message, code=None, stderr=(), returncode=None):
+        super().__init__(message)
+        self.code = code
+        self.stderr = list(stderr)  # 최근 드라이버 stderr (오류 분류용)
+        self.returncode = returncode
+
+
+def resolve_driver_command(command=None):
+    """드라이버 실행 명령을 만든다 (스크립트 디렉토리 기준 상대경로 인자는 절대경로로 변환)"""
+    command = list(command or DEFAULT_DRIVER_COMMAND)
+    resolved = []
+    for arg in command:
+        candidate = os.path.join(SCRIPT_DIR, arg)
+        if not os.path.isabs(arg) and os.path.exists(candidate):
+            resolved.append(candidate)
+        else:
+            resolved.append(arg)
+    return resolved
+
+
+class UIDriver:
+    def __init__(self, command=None, log=None, timeout=30.0):
+        self.command = resolve_driver_command(command)
+        self.log = log or (lambda message: None)
+        self.timeout = timeout
+        self.process = None
+        self.responses = None
+        self.request_id = 0
+        self.lock = threading.Lock()
+        self.stderr_tail = deque(maxlen=20)
+        self.stderr_thread = None
+
+    def is_alive(self):
+        """드라이버 프로세스가 살아있는지 확인"""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """드라이버 프로세스 시작 (이미 실행 중이면 재사용)"""
+        if self.is_alive():
+            return
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        self.responses = queue.Queue()
+        self.stderr_tail.clear()
+        threading.Thread(target=self._read_stdout, args=(self.process, self.responses), daemon=True).start()
+        self.stderr_thread = threading.Thread(target=self._read_stderr, args=(self.process,), daemon=True)
+        self.stderr_thread.start()
+        self.log(f"🔌 UI 드라이버 시작 (PID: {self.process.pid})")
+
+    def _read_stdout(self, process, responses):
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                self.log(f"⚠️  UI 드라이버 응답 파싱 오류: {line}")
+        responses.put(None)  # EOF
+
+    def _read_stderr(self, process):
+        for line in process.stderr:
+            line = line.strip()
+            if line:
+                self.stderr_tail.append(line)
+                self.log(f"UI 드라이버: {line}")
+
+    def request(self, action, **params):
+        """드라이버에 요청을 보내고 결과를 반환 (프로세스가 죽어있으면 한 번 재시작)"""
+        with self.lock:
+            if not self.is_alive():
+                if self.process is not None:
+                    self.log("⚠️  UI 드라이버가 종료되어 재시작합니다")
+                self.start()
+
+            self.request_id += 1
+            payload = dict(params, id=self.request_id, action=action)
+            try:
+                # ASCII로 인코딩하여 드라이버 쪽에서 청크 경계 문제가 없도록 한다
+                self.process.stdin.write(json.dumps(payload, ensure_ascii=True) + '\n')
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                raise self._error(f"UI 드라이버 파이프 오류: {e}")
+
+            while True:
+                try:
+                    response = self.responses.get(timeout=self.timeout)
+                except queue.Empty:
+                    self._kill()
+                    raise self._error(f"UI 드라이버 응답 시간 초과 ({action})")
+                if response is None:
+                    try:
+                        self.process.wait(timeout=1.0)  # 종료 코드 확인
+                    except subprocess.TimeoutExpired:
+                        pass
+                    raise self._error(f"UI 드라이버가 응답 없이 종료됨 ({action})")
+                if response.get('id') == self.request_id:
+                    break
+
+            if not response.get('ok'):
+                raise self._error(response.get('error', '알 수 없는 오류'), response.get('code'))
+            return response.get('result')
+
+    def _error(self, message, code=None):
+        """드라이버가 종료되었으면 종료 코드와 마지막 stderr를 붙인 UIDriverError"""
+        if self.process is None or self.process.poll() is None:
+            return UIDriverError(message, code)
+        if self.stderr_thread is not None:
+            self.stderr_thread.join(timeout=1.0)  # 종료 직전 stderr까지 읽도록 대기
+        return UIDriverError(message, code, self.stderr_tail, self.process.returncode)
+
+    def _kill(self):
+        if self.is_alive():
+            self.process.kill()
+            self.process.wait()
+
+    def close(self):
+        """드라이버 프로세스 종료 (stdin을 닫으면 드라이버 루프가 끝난다)"""
+        if self.process is None:
+            return
+        try:
+            if self.is_alive():
+                self.process.stdin.close()
+                self.process.wait(timeout=2)
+        except (subprocess.TimeoutExpired, OSError):
+            self._kill()
+        self.log("🔌 UI 드라이버 종료")
+        self.process = None
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Linux 테스트용 UI 드라이버 스텁
+cursor_driver.js와 같은 파이프 프로토콜을 흉내내며, 받은 요청을 stderr에 기록한다
+config.json에 "ui_driver_command": ["python3", "ui_driver_stub.py"] 로 지정해서 사용
+"""
+
+import json
+import sys
+
+
+# 입력창 상태 흉내 (keystroke로 채워지고 Enter로 비워짐)
+state = {'value_length': 0}
+
+
+def handle(request):
+    action = request.get('action')
+    if action == 'ping':
+        return 'pong'
+    if action == 'activate':
+        return True
+    if action == 'key':
+        if request.get('code') == 36:
+            state['value_length'] = 0
+        elif request.get('code') == 9 and 'command down' in request.get('modifiers', []):
+            state['value_length'] += 1  # Cmd+V: 붙여넣은 내용은 알 수 없으므로 비어있지 않음만 표시
+        return True
+    if action == 'keystroke':
+        state['value_length'] += len(request.get('text', ''))
+        return True
+    if action == 'click_chat':
+        return 'coordinates'
+    if action == 'focus_window':
+        return request.get('title')
+    if action == 'probe':
+        return {
+            'frontmost': request.get('app', 'Cursor'),
+            'focused_role': 'AXTextArea',
+            'value_length': state['value_length'],
+        }
+    raise ValueError(f"알 수 없는 요청: {action}")
+
+
+def main():
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request = json.loads(line)
+        response = {'id': request.get('id')}
+        try:
+            response['result'] = handle(request)
+            response['ok'] = True
+        except Exception as e:
+            response['ok'] = False
+            response['error'] = str(e)
+        if request.get('action') != 'probe':
+            print(f"stub: {json.dumps(request, ensure_ascii=False)}", file=sys.stderr, flush=True)
+        print(json.dumps(response), flush=True)
+
+
+if __name__ == "__main__":
+    main()
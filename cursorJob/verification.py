@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+전송 결과 검증
+osascript가 성공해도 프롬프트가 실제로 반영되었는지는 알 수 없으므로,
+전송 전후 워크스페이스 스냅샷을 비교하고 명령별 검증 조건을 확인한다
+
+스냅샷은 증분 방식: 매번 stat으로만 훑고 (mtime, 크기)가 바뀐 파일만 다시 해시한다
+mtime만 바뀌고 내용이 같은 파일은 변경으로 보지 않는다
+검사할 파일이 정해져 있으면(changed 파일 목록, number 파일) 그 파일만 stat하고,
+워크스페이스 전체 탐색은 어떤 파일이든 바뀌었는지 봐야 할 때(@참조 없는 changed: true, 조건 없음)만 한다
+
+config.json의 명령 항목 예:
+    "verify": {"changed": true, "number": {"delta": 4}, "on_fail": "advance"}
+- changed: true(명령의 @참조 파일, 참조가 없으면 아무 파일), 또는 바뀌어야 하는 파일 목록
+- number: 파일의 마지막 숫자가 delta만큼 늘었는지 / factor배가 되었는지 (file 생략 시 첫 번째 @참조 파일)
+- on_fail: advance(실패로 기록하고 진행, 기본값) 또는 retry(같은 회차를 재시도 정책에 따라 다시 전송)
+  프롬프트가 멱등이 아니면 AI가 timeout보다 늦게 끝났을 때 같은 작업이 중복되므로 retry는 명시한 경우에만 사용
+  검증 실패는 AI 작업 결과의 문제이므로 회로 차단기에는 반영되지 않는다
+- timeout: 완료 감지기가 없을 때 조건이 맞을 때까지 기다리는 최대 시간 (초, 기본 30)
+"""
+
+import hashlib
+import math
+import os
+import re
+
+from completion import find_references
+from send_cache import DEFAULT_EXCLUDE, is_file_reference, iter_workspace_files
+
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d+)?')
+ON_FAIL_RETRY = 'retry'
+ON_FAIL_ADVANCE = 'advance'
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(65536), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def read_number(path):
+    """파일의 마지막 숫자 (지시문 안의 숫자 뒤에 값이 오는 direction_*.md 형식), 없으면 None"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            numbers = NUMBER_PATTERN.findall(f.read())
+    except OSError:
+        return None
+    if not numbers:
+        return None
+    value = numbers[-1]
+    return float(value) if '.' in value else int(value)
+
+
+class WorkspaceDiff:
+    def __init__(self, changed, added, removed):
+        self.changed = changed
+        self.added = added
+        self.removed = removed
+
+    @property
+    def modified(self):
+        return self.changed + self.added
+
+    def describe(self):
+        parts = [f"{label} {', '.join(paths)}" for label, paths in
+                 (('변경', self.changed), ('추가', self.added), ('삭제', self.removed)) if paths]
+        return ', '.join(parts) or '변경 없음'
+
+
+class WorkspaceWatcher:
+    """워크스페이스 파일 {상대경로: (mtime_ns, 크기, 내용 해시)} 스냅샷을 증분으로 갱신"""
+
+    def __init__(self, root, exclude=DEFAULT_EXCLUDE):
+        self.root = root
+        self.exclude = tuple(exclude)
+        self.files = {}
+        self.hashed = 0  # 지금까지 내용을 해시한 파일 수
+
+    def snapshot(self, paths=None):
+        """paths(상대경로 목록)가 있으면 그 파일만, 없으면 워크스페이스 전체"""
+        if paths is not None:
+            return self._snapshot_paths(paths)
+        files = {}
+        for relpath, path, stat in iter_workspace_files(self.root, self.exclude):
+            self._record(files, relpath, path, stat)
+        self.files = files
+        return files
+
+    def _snapshot_paths(self, paths):
+        files = {}
+        for relpath in paths:
+            path = os.path.join(self.root, relpath)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self.files.pop(relpath, None)
+                continue
+            self._record(files, relpath, path, stat)
+        self.files.update(files)
+        return files
+
+    def _record(self, files, relpath, path, stat):
+        previous = self.files.get(relpath)
+        if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+            files[relpath] = previous
+            return
+        digest = hash_file(path)
+        if digest is not None:
+            files[relpath] = (stat.st_mtime_ns, stat.st_size, digest)
+            self.hashed += 1
+
+
+def diff_snapshots(before, after):
+    """내용 해시 기준 변경/추가/삭제 파일"""
+    changed = sorted(p for p in after if p in before and after[p][2] != before[p][2])
+    added = sorted(p for p in after if p not in before)
+    removed = sorted(p for p in before if p not in after)
+    return WorkspaceDiff(changed, added, removed)
+
+
+class VerificationResult:
+    def __init__(self, failures, diff):
+        self.failures = failures
+        self.diff = diff
+
+    @property
+    def passed(self):
+        return not self.failures
+
+    def describe(self):
+        return '; '.join(self.failures) if self.failures else self.diff.describe()
+
+
+class PostSendVerifier:
+    """명령 하나의 검증 조건 (arm()으로 전송 전 상태를 기록하고 check()로 확인)"""
+
+    def __init__(self, spec, command, watcher):
+        self.spec = spec
+        self.watcher = watcher
+        self.on_fail = spec.get('on_fail', ON_FAIL_ADVANCE)
+        if self.on_fail not in (ON_FAIL_RETRY, ON_FAIL_ADVANCE):
+            raise ValueError(f"on_fail은 {ON_FAIL_RETRY} 또는 {ON_FAIL_ADVANCE}여야 합니다")
+        self.timeout = spec.get('timeout', 30)
+        refs = [os.path.normpath(ref) for ref in find_references(command) if is_file_reference(ref)]
+
+        changed = spec.get('changed')
+        if changed is True:
+            self.changed = refs  # 빈 목록이면 아무 파일이나 바뀌면 통과
+        elif changed:
+            self.changed = [os.path.normpath(path) for path in changed]
+        else:
+            self.changed = None
+
+        self.number = spec.get('number')
+        self.number_file = None
+        if self.number:
+            self.number_file = self.number.get('file', refs[0] if refs else None)
+            if not self.number_file:
+                raise ValueError("number 검증 대상 파일이 없습니다 (file 또는 @참조 필요)")
+            if ('delta' in self.number) == ('factor' in self.number):
+                raise ValueError("number에는 delta와 factor 중 하나만 지정합니다")
+        self.before = {}
+        self.number_before = None
+        self.paths = self._watched_paths()
+        self.description = self._describe()
+
+    def _watched_paths(self):
+        """스냅샷할 파일 목록 (None이면 워크스페이스 전체)"""
+        if self.changed == [] or (self.changed is None and not self.number):
+            return None
+        paths = list(self.changed or [])
+        if self.number and os.path.normpath(self.number_file) not in paths:
+            paths.append(os.path.normpath(self.number_file))
+        return paths
+
+    def _describe(self):
+        parts = []
+        if self.changed is not None:
+            parts.append(f"변경 확인 ({', '.join(self.changed) or '아무 파일'})")
+        if self.number:
+            change = f"+{self.number['delta']}" if 'delta' in self.number else f"x{self.number['factor']}"
+            parts.append(f"숫자 {change} ({self.number_file})")
+        return ', '.join(parts) or '변경 기록만'
+
+    def _number_path(self):
+        return os.path.join(self.watcher.root, self.number_file)
+
+    def arm(self):
+        """전송 직전 상태 기록"""
+        self.before = self.watcher.snapshot(self.paths)
+        if self.number:
+            self.number_before = read_number(self._number_path())
+
+    def expected_number(self):
+        if self.number_before is None:
+            return None
+        if 'delta' in self.number:
+            return self.number_before + self.number['delta']
+        return self.number_before * self.number['factor']
+
+    def check(self):
+        diff = diff_snapshots(self.before, self.watcher.snapshot(self.paths))
+        failures = []
+        if self.changed:
+            missing = [path for path in self.changed if path not in diff.modified]
+            if missing:
+                failures.append(f"변경되지 않음: {', '.join(missing)}")
+        elif self.changed is not None and not diff.modified:
+            failures.append("변경된 파일 없음")
+        if self.number:
+            expected = self.expected_number()
+            actual = read_number(self._number_path())
+            if expected is None or actual is None:
+                failures.append(f"{self.number_file}에서 숫자를 읽을 수 없음")
+            elif not math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9):
+                failures.append(f"{self.number_file}: 기대값 {expected}, 실제 {actual} (이전 {self.number_before})")
+        return VerificationResult(failures, diff)
+
+
+def create_verifier(command_config, watcher):
+    """명령 설정의 verify 항목으로 검증기 생성 (없으면 None, 잘못된 설정은 ValueError)"""
+    spec = command_config.get('verify')
+    if not spec:
+        return None
+    if spec is True:
+        spec = {'changed': True}
+    return PostSendVerifier(spec, command_config.get('command', ''), watcher)